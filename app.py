@@ -1,138 +1,92 @@
 import json
 import os
-import time
-import random
-import itertools
 import numpy as np
-from collections import defaultdict
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, Response, abort, jsonify, request, send_file, stream_with_context
 from flask_cors import CORS
+from werkzeug.security import safe_join
+import http_cache
+import metrics
+import profiling
+import serialization
+from data_registry import DataRegistry, load_json
+from head_to_head import HeadToHeadTable
+from http_cache import send_cached, snapshot_json
+from playoffs import MAX_PLAYOFF_SEASONS, PlayoffTable, bracket_teams, odds_summary
+from result_cache import ResultCache
+from samplers import SamplerTable
+from schedule import generate_fair_schedule, schedule_cache_info, schedule_game_days
+from season_engine import (
+    expand_schedule, ot_goals, player_goal_counts, simulate_games, simulate_goal_games, simulate_matchups,
+    simulate_seasons, simulate_player_seasons, season_streams, MAX_SEASONS
+)
+from shared_cache import SharedFileCache
+from what_if import InvalidMove, ScenarioBook, ScenarioSnapshot, UnknownScenario
+import parallel
 
 app = Flask(__name__, static_folder="static")
 CORS(app)
+app.json = serialization.JSONProvider(app)
+http_cache.install(app)
+metrics.install(app)
+profiling.install(app)
 
 CACHE_FILE = "team_strengths.json"
 TEAM_RATINGS_FILE = "team_ratings.json"
 PLAYER_RATINGS_FILE = "team_rosters.json"
+SEASON_STRENGTHS_FILE = "static/normalized_ratings.json"
+MERGED_PLAYERS_FILE = "static/merged_players.json"
 CACHE_TTL_SECONDS = 86400  # 24 hours
+REGISTRY_CHECK_SECONDS = 2
+MAX_PLAYER_SEASONS = 1000
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR")  # shared across server processes when set
+SCENARIO_DIR = os.environ.get("SCENARIO_DIR")  # what-if scenarios visible to every server process when set
+MAX_BATCH_MATCHUPS = 1000
+MAX_BATCH_GAMES = 200000  # total repeats across one batch
+BATCH_TOP_SCORERS = 3
+PARALLEL_MIN_SEASONS = 20000  # below this, pool start-up costs more than it saves
+RELOAD_STAMP = os.environ.get("RELOAD_STAMP", ".reload")  # touch to make every worker re-read its data
 
 # --- Helpers ---
 
 def normalize_rating(rating, min_rating=75, max_rating=100):
     return round(0.5 + ((rating - min_rating) / (max_rating - min_rating)) * 0.5, 3)
 
-def load_or_generate_strengths(force_refresh=False):
-    current_time = time.time()
-
-    if not force_refresh and os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, 'r') as f:
-            cached = json.load(f)
-            if current_time - cached.get("_timestamp", 0) < CACHE_TTL_SECONDS:
-                return cached["data"]
-
+def generate_strengths():
     with open(TEAM_RATINGS_FILE, 'r') as f:
         raw_ratings = json.load(f)
 
-    strengths = {
+    return {
         team: normalize_rating(rating)
         for team, rating in raw_ratings.items()
     }
 
-    with open(CACHE_FILE, 'w') as f:
-        json.dump({"_timestamp": current_time, "data": strengths}, f, indent=2)
-
-    return strengths
-
-def generate_fair_schedule(teams, games_per_team=82, n_attempts=10000):
-
-    max_outer_attempts = 10
-    
-    ATL = ['TOR', 'TBL', 'FLA', 'OTT', 'MTL', 'DET', 'BUF', 'BOS']
-    MTR = ['WSH', 'CAR', 'NJD', 'CBJ', 'NYR', 'NYI', 'PIT', 'PHI']
-    CEN = ['WPG', 'DAL', 'COL', 'MIN', 'STL', 'UTA', 'NSH', 'CHI']
-    PCF = ['VGK', 'LAK', 'EDM', 'CGY', 'VAN', 'ANA', 'SEA', 'SJS']
-    divisions = [ATL, MTR, CEN, PCF]
-
-    def division_of(team):
-        for div in divisions:
-            if team in div:
-                return div
-        return []
-
-    def same_division(t1, t2):
-        return t2 in division_of(t1)
-
-    def same_conference(t1, t2):
-        east = ATL + MTR
-        west = CEN + PCF
-        return (t1 in east and t2 in east) or (t1 in west and t2 in west)
-
-    for attempt in range(n_attempts):
-        matchup_counts = defaultdict(int)
-        team_games = defaultdict(int)
-
-        all_pairs = list(itertools.combinations(teams, 2))
-        weighted_pairs = []
-
-        for t1, t2 in all_pairs:
-            if same_division(t1, t2):
-                weight = 5
-            elif same_conference(t1, t2):
-                weight = 3
-            else:
-                weight = 2
-            weighted_pairs.extend([(t1, t2)] * weight)
-
-        random.shuffle(weighted_pairs)
-        total_games_needed = (games_per_team * len(teams)) // 2
-
-        for t1, t2 in weighted_pairs:
-            if team_games[t1] < games_per_team and team_games[t2] < games_per_team:
-                key = tuple(sorted((t1, t2)))
-                matchup_counts[key] += 1
-                team_games[t1] += 1
-                team_games[t2] += 1
-
-            if sum(team_games.values()) // 2 >= total_games_needed:
-                break
-
-        # debug loop - uncomment to see full teams schedule
-        # f all(g == games_per_team for g in team_games.values()):
-            # print("\nMTL Matchups:")
-            # for (t1, t2), count in matchup_counts.items():
-                # if 'MTL' in (t1, t2):
-                    # opponent = t2 if t1 == 'MTL' else t1
-                    # print(f"MTL vs {opponent}: {count} games")
-
-
-        if all(team_games[t] == games_per_team for t in teams):
-            print(f"✅ Schedule generated in attempt {attempt + 1}")
-            return matchup_counts
-
-    raise RuntimeError("❌ Failed to generate a fair schedule after multiple attempts")
-
+# Shared by every server process; recomputed once per TTL or ratings change
+strength_cache = SharedFileCache(CACHE_FILE, CACHE_TTL_SECONDS, generate_strengths, sources=[TEAM_RATINGS_FILE])
 
+def load_or_generate_strengths(force_refresh=False):
+    return strength_cache.get(force=force_refresh)
 
-def simulate_game(str1, str2):
+def simulate_game(str1, str2, rng):
     base_rate = 4.8
     expected1 = base_rate * str1
     expected2 = base_rate * str2
 
-    score1 = np.random.poisson(expected1)
-    score2 = np.random.poisson(expected2)
+    score1 = int(rng.poisson(expected1))
+    score2 = int(rng.poisson(expected2))
 
     blowout_chance = min(0.05 + (str1 - str2) * 0.1, 0.3)
-    if np.random.rand() < blowout_chance:
+    if rng.random() < blowout_chance:
         if str1 > str2:
-            return 8, random.randint(0, 2), 1, False
+            return 8, int(rng.integers(0, 3)), 1, False
         else:
-            return random.randint(0, 2), 8, 2, False
+            return int(rng.integers(0, 3)), 8, 2, False
 
     upset_chance = 0.05
-    if str1 < str2 and np.random.rand() < upset_chance:
-        return random.randint(4, 5), random.randint(0, 2), 1, False
-    if str2 < str1 and np.random.rand() < upset_chance:
-        return random.randint(0, 2), random.randint(4, 5), 2, False
+    if str1 < str2 and rng.random() < upset_chance:
+        return int(rng.integers(4, 6)), int(rng.integers(0, 3)), 1, False
+    if str2 < str1 and rng.random() < upset_chance:
+        return int(rng.integers(0, 3)), int(rng.integers(4, 6)), 2, False
 
     score1 = min(score1, 10)
     score2 = min(score2, 10)
@@ -143,72 +97,23 @@ def simulate_game(str1, str2):
         elif str2 > str1:
             return score1, score2, 2, True
         else:
-            return score1, score2, random.choice([1, 2]), True
+            return score1, score2, int(rng.integers(1, 3)), True
 
     return score1, score2, 1 if score1 > score2 else 2, False
 
-def pick_weighted_player(players):
-    total = sum(p['rating'] for p in players)
-    r = random.uniform(0, total)
-    upto = 0
-    for p in players:
-        upto += p['rating']
-        if upto >= r:
-            return p
-    return random.choice(players)
-
-def pick_assist_players(goal_scorer, team_players, max_assists=2):
-    eligible = [p for p in team_players if p["name"] != goal_scorer["name"]]
-
-    # Bias toward 1 or 2 assists: weighted random choice
-    assist_options = [0, 1, 2]
-    weights = [0.1, 0.45, 0.45]  # Adjust to your liking
-    num_assists = random.choices(assist_options, weights=weights, k=1)[0]
-
-    assists = []
-    for _ in range(num_assists):
-        if eligible:
-            assist = pick_weighted_player(eligible)
-            assists.append(assist)
-            eligible = [p for p in eligible if p["name"] != assist["name"]]
-
-    return assists
-
-def generate_goal_time_and_period():
-    period = random.choices([1, 2, 3, 4], weights=[30, 30, 30, 10])[0]
-    minute = random.randint(0, 19)
-    second = random.randint(0, 59)
+def generate_goal_time_and_period(rng):
+    period = int(rng.choice([1, 2, 3, 4], p=[0.3, 0.3, 0.3, 0.1]))
+    minute = int(rng.integers(0, 20))
+    second = int(rng.integers(0, 60))
     return period, f"{minute:02d}:{second:02d}"
 
-def simulate_game_with_scorers(str1, str2, players1, players2):
+def simulate_game_with_scorers(str1, str2, sampler1, sampler2, rng):
     base_rate = 2.9
     expected1 = base_rate * str1
     expected2 = base_rate * str2
 
-    goals1 = min(np.random.poisson(expected1), 8)
-    goals2 = min(np.random.poisson(expected2), 8)
-
-    detailed_goals1 = []
-    detailed_goals2 = []
-
-    all_goals = []
-
-    # First generate all regulation goals
-    for team_id, team_players, goal_count in [(1, players1, goals1), (2, players2, goals2)]:
-        for _ in range(goal_count):
-            scorer = pick_weighted_player(team_players)
-            assists = pick_assist_players(scorer, team_players)
-            period = random.choices([1, 2, 3], weights=[33, 33, 34])[0]  # Only periods 1-3
-            minute = random.randint(0, 19)
-            second = random.randint(0, 59)
-            time_str = f"{minute:02d}:{second:02d}"
-            all_goals.append({
-                "team": team_id,
-                "scorer": scorer["name"],
-                "assists": [a["name"] for a in assists],
-                "period": period,
-                "time": time_str
-            })
+    goals1 = min(int(rng.poisson(expected1)), 8)
+    goals2 = min(int(rng.poisson(expected2)), 8)
 
     # Determine winner and optionally simulate OT goal
     if goals1 > goals2:
@@ -219,31 +124,38 @@ def simulate_game_with_scorers(str1, str2, players1, players2):
         tie = False
     else:
         tie = True
-        winner = random.choice([1, 2])  # OT winner
-
-        # Add 1 OT goal for the winning team
-        ot_players = players1 if winner == 1 else players2
-        scorer = pick_weighted_player(ot_players)
-        assists = pick_assist_players(scorer, ot_players)
-        minute = random.randint(0, 4)
-        second = random.randint(0, 59)
-        time_str = f"{minute:02d}:{second:02d}"
-        all_goals.append({
-            "team": winner,
-            "scorer": scorer["name"],
-            "assists": [a["name"] for a in assists],
-            "period": 4,
-            "time": time_str
-        })
+        winner = int(rng.integers(1, 3))  # OT winner
+
+    all_goals = []
+
+    for team_id, sampler, goal_count in [(1, sampler1, goals1), (2, sampler2, goals2)]:
+        # Regulation goals plus 1 OT goal for the winning team
+        n_goals = goal_count + (1 if tie and winner == team_id else 0)
+        if n_goals == 0:
+            continue
+
+        scorers, assists = sampler.draw_goals(n_goals, rng)
+        periods = rng.choice([1, 2, 3], size=n_goals, p=[0.33, 0.33, 0.34])  # Only periods 1-3
+        minutes = rng.integers(0, 20, size=n_goals)
+        seconds = rng.integers(0, 60, size=n_goals)
+        if n_goals > goal_count:
+            periods[-1] = 4
+            minutes[-1] = rng.integers(0, 5)
+
+        for scorer, goal_assists, period, minute, second in zip(scorers, assists, periods, minutes, seconds):
+            all_goals.append({
+                "team": team_id,
+                "scorer": sampler.names[scorer],
+                "assists": [sampler.names[a] for a in goal_assists if a >= 0],
+                "period": int(period),
+                "time": f"{minute:02d}:{second:02d}"
+            })
 
     # Sort and categorize
     all_goals.sort(key=lambda g: (g["period"], g["time"]))
 
-    for goal in all_goals:
-        if goal["team"] == 1:
-            detailed_goals1.append(goal)
-        else:
-            detailed_goals2.append(goal)
+    detailed_goals1 = [goal for goal in all_goals if goal["team"] == 1]
+    detailed_goals2 = [goal for goal in all_goals if goal["team"] == 2]
 
     return {
         "score1": goals1,
@@ -254,29 +166,8 @@ def simulate_game_with_scorers(str1, str2, players1, players2):
         "goals_team2": detailed_goals2
     }
 
-# --- Routes ---
-
-@app.route("/api/team-strengths", methods=["GET"])
-def get_team_strengths():
-    # force = request.args.get("force") == "1"
-    strengths = load_or_generate_strengths()
-    return jsonify(strengths)
-
-@app.route("/api/simulate-season", methods=["GET"])
-def simulate_season():
-    strengths = load_or_generate_strengths()
-    teams = list(strengths.keys())
-
-    with open('static/normalized_ratings.json', "r") as f:
-        strength_data = json.load(f)
-    
-    print(strength_data)
-    
-    games_per_team = 82
-
-    schedule = generate_fair_schedule(teams, games_per_team)
-
-    results = {
+def new_season_results(teams):
+    return {
         team: {
             "wins": 0,
             "points": 0,
@@ -286,71 +177,485 @@ def simulate_season():
         } for team in teams
     }
 
+def record_game(results, team1, team2, s1, s2, winner, is_tie):
+    results[team1]["games_played"] += 1
+    results[team2]["games_played"] += 1
+    results[team1]["goal_diff"] += s1 - s2
+    results[team2]["goal_diff"] += s2 - s1
+
+    if winner == 1:
+        win_team, lose_team, win_score, lose_score = team1, team2, s1, s2
+    else:
+        win_team, lose_team, win_score, lose_score = team2, team1, s2, s1
+
+    # OT/shootout losers still get a point
+    results[win_team]["points"] += 2
+    results[win_team]["wins"] += 1
+    if is_tie:
+        results[lose_team]["points"] += 1
+
+    biggest = results[win_team]["biggest_win"]
+    if win_score - lose_score > biggest[0] - biggest[1]:
+        results[win_team]["biggest_win"] = (win_score, lose_score, lose_team)
+
+def format_standings(results):
+    standings = sorted(results.items(), key=lambda x: (x[1]['points'], x[1]['wins']), reverse=True)
+    return [
+        {
+            "rank": i + 1,
+            "team": team,
+            "points": stats["points"],
+            "wins": stats["wins"],
+            "goal_diff": int(stats["goal_diff"]),
+            "games_played": stats["games_played"],
+            "biggest_win": {
+                "score": f"{stats['biggest_win'][0]}-{stats['biggest_win'][1]}",
+                "opponent": stats["biggest_win"][2]
+            }
+        } for i, (team, stats) in enumerate(standings)
+    ]
+
+def play_regular_season(teams, strength_data, games_per_team, seed):
+    schedule_seed, rng = season_streams(seed)
+    schedule = generate_fair_schedule(teams, games_per_team, seed=schedule_seed)
+
+    results = new_season_results(teams)
+
     for (team1, team2), count in schedule.items():
 
         for _ in range(count):
-            s1, s2, winner, is_tie = simulate_game(strength_data[team1], strength_data[team2])
-            results[team1]["games_played"] += 1
-            results[team2]["games_played"] += 1
-            results[team1]["goal_diff"] += s1 - s2
-            results[team2]["goal_diff"] += s2 - s1
-
-            if is_tie:
-                results[team1]["points"] += 1
-                results[team2]["points"] += 1
-                if winner == 1:
-                    results[team1]["points"] += 1
-                    results[team1]["wins"] += 1
-                    if s1 - s2 > results[team1]["biggest_win"][0] - results[team1]["biggest_win"][1]:
-                        results[team1]["biggest_win"] = (s1, s2, team2)
-                else:
-                    results[team2]["points"] += 1
-                    results[team2]["wins"] += 1
-                    if s2 - s1 > results[team2]["biggest_win"][0] - results[team2]["biggest_win"][1]:
-                        results[team2]["biggest_win"] = (s2, s1, team1)
-            else:
-                if winner == 1:
-                    results[team1]["points"] += 2
-                    results[team1]["wins"] += 1
-                    if s1 - s2 > results[team1]["biggest_win"][0] - results[team1]["biggest_win"][1]:
-                        results[team1]["biggest_win"] = (s1, s2, team2)
-                else:
-                    results[team2]["points"] += 2
-                    results[team2]["wins"] += 1
-                    if s2 - s1 > results[team2]["biggest_win"][0] - results[team2]["biggest_win"][1]:
-                        results[team2]["biggest_win"] = (s2, s1, team1)
+            s1, s2, winner, is_tie = simulate_game(strength_data[team1], strength_data[team2], rng)
+            record_game(results, team1, team2, s1, s2, winner, is_tie)
+
+    metrics.games_simulated(sum(schedule.values()), "score")
+    return results
+
+# --- Data ---
+
+result_cache = ResultCache(max_entries=RESULT_CACHE_ENTRIES, disk_dir=RESULT_CACHE_DIR)
+# Results for replaced data are never asked for again; scenarios keep their own base snapshot and fingerprints
+registry = DataRegistry(check_interval=REGISTRY_CHECK_SECONDS, stamp=RELOAD_STAMP,
+                        on_load=lambda name, seconds: metrics.observe_phase("load", seconds, source=name),
+                        on_reload=lambda previous, snapshot: result_cache.purge(previous.fingerprint))
+registry.register("strengths", [TEAM_RATINGS_FILE, CACHE_FILE], load_or_generate_strengths,
+                  max_age=CACHE_TTL_SECONDS)
+registry.register("season_strengths", [SEASON_STRENGTHS_FILE], lambda: load_json(SEASON_STRENGTHS_FILE))
+# Plain JSON: the app needs whole records, which json.load builds faster than
+# snapshot_store.load_records rebuilds them from columns
+registry.register("rosters", [PLAYER_RATINGS_FILE], lambda: load_json(PLAYER_RATINGS_FILE))
+registry.register("merged_players", [MERGED_PLAYERS_FILE], lambda: load_json(MERGED_PLAYERS_FILE))
+
+sampler_table = SamplerTable()
+head_to_head_table = HeadToHeadTable()
+playoff_table = PlayoffTable()
+
+def cached_result(data, endpoint, params, seed, compute):
+    compute = metrics.timed("simulate", compute, endpoint=endpoint)
+    if profiling.active():
+        return compute()  # on this thread, where the profiler can see it, and never a cache hit
+    return result_cache.get_or_compute(data.fingerprint, endpoint, params, seed, lambda: parallel.offload(compute))
+
+@metrics.collector
+def cache_metrics():
+    cache = result_cache.stats()
+    schedules = schedule_cache_info()
+    return [
+        ("result_cache_hits_total", "counter", "Simulation results served from the result cache.",
+         [({}, cache["hits"])]),
+        ("result_cache_misses_total", "counter", "Seeded simulation results that had to be computed.",
+         [({}, cache["misses"])]),
+        ("result_cache_entries", "gauge", "Results held in the in-memory cache tier.", [({}, cache["entries"])]),
+        ("strength_recomputes_total", "counter", "Team strength recomputes done by this process.",
+         [({}, strength_cache.recomputes)]),
+        ("schedule_builds_total", "counter", "Schedules constructed by generate_fair_schedule.",
+         [({}, schedules.misses)]),
+        ("schedule_cache_hits_total", "counter", "generate_fair_schedule calls served from the memo.",
+         [({}, schedules.hits)])
+    ]
+
+# What-if scenarios keep their own derived tables, so they never evict the live ones
+
+def roster_samplers(data):
+    if isinstance(data, ScenarioSnapshot):
+        return data.scenario.samplers()
+    return sampler_table.get(data["rosters"], data.versions["rosters"])
+
+def head_to_head(data):
+    table = data.scenario.head_to_head_table if isinstance(data, ScenarioSnapshot) else head_to_head_table
+    return table.get(data["strengths"], data.versions["strengths"])
+
+def playoff_model(data, teams):
+    table = data.scenario.playoff_table if isinstance(data, ScenarioSnapshot) else playoff_table
+    return table.get(teams, data["season_strengths"], data.versions["season_strengths"])
+
+def scenario_source():
+    data = registry.snapshot()
+    return data, data["merged_players"], roster_samplers(data)
+
+scenarios = ScenarioBook(scenario_source, normalize_rating, disk_dir=SCENARIO_DIR)
+
+def warm_caches():
+    """Load every data source and build the derived tables ahead of the first request.
+
+    Run before a pre-forking server forks, so workers start with the data,
+    samplers, head-to-head table and default schedule already in memory.
+    """
+    data = registry.refresh(force=True)
+    teams = list(data["strengths"].keys())
+    roster_samplers(data)
+    head_to_head(data)
+    playoff_model(data, teams)
+    generate_fair_schedule(teams, 82)
+    return data
+
+# --- Request helpers ---
+
+class InvalidParameter(Exception):
+    pass
+
+@app.errorhandler(InvalidParameter)
+@app.errorhandler(InvalidMove)
+@app.errorhandler(serialization.InvalidShape)
+def invalid_parameter(error):
+    return jsonify({"error": str(error)}), 400
+
+@app.errorhandler(parallel.JobFailed)
+def job_failed(error):
+    return jsonify({"error": str(error)}), 500
+
+@app.errorhandler(UnknownScenario)
+def unknown_scenario(error):
+    return jsonify({"error": str(error)}), 404
+
+def request_body():
+    """The JSON body, {} when there is none; anything but an object is a 400."""
+    body = request.get_json(silent=True)
+    if body is None:
+        return {}
+    if not isinstance(body, dict):
+        raise InvalidParameter("The request body must be a JSON object.")
+    return body
+
+def request_data():
+    """The registry snapshot, or its what-if version when a `scenario` id is given."""
+    scenario_id = request.args.get("scenario")
+    if scenario_id is None and request.is_json:
+        scenario_id = request_body().get("scenario")
+    if scenario_id is None:
+        return registry.snapshot()
+    return scenarios.get(scenario_id).snapshot()
+
+def request_seed():
+    """Optional non-negative integer `seed` from the query string or JSON body."""
+    seed = request.args.get("seed")
+    if seed is None and request.is_json:
+        seed = request_body().get("seed")
+    if seed is None:
+        return None
+    try:
+        seed = int(seed)
+    except (TypeError, ValueError):
+        raise InvalidParameter("seed must be a non-negative integer.")
+    if seed < 0:
+        raise InvalidParameter("seed must be a non-negative integer.")
+    return seed
+
+def request_int(name, default=None):
+    """Optional integer query parameter `name`; anything else is a 400, not the default."""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidParameter(f"{name} must be an integer.")
+
+def request_top(players, default=25):
+    """The `top` query parameter for a leaderboard of `players`; 1 to `players`."""
+    top = request_int("top", default=min(default, players))
+    if not 1 <= top <= players:
+        raise InvalidParameter(f"top must be between 1 and {players}.")
+    return top
+
+def batch_matchups(body, strengths, samplers=None):
+    """Validate the `games` list of a batch request; returns (team1s, team2s, repeats)."""
+    games = body.get("games")
+    if not isinstance(games, list) or not 1 <= len(games) <= MAX_BATCH_MATCHUPS:
+        raise InvalidParameter(f"games must be a list of 1 to {MAX_BATCH_MATCHUPS} matchups.")
+
+    team1s, team2s, repeats = [], [], []
+    for i, game in enumerate(games):
+        if not isinstance(game, dict):
+            raise InvalidParameter(f"games[{i}] must be an object with team1, team2 and repeats.")
+        team1, team2 = game.get("team1"), game.get("team2")
+        count = game.get("repeats", 1)
+        if team1 not in strengths or team2 not in strengths:
+            raise InvalidParameter(f"games[{i}]: one or both teams are invalid.")
+        if team1 == team2:
+            raise InvalidParameter(f"games[{i}]: please select two different teams.")
+        if samplers is not None and (team1 not in samplers or team2 not in samplers):
+            raise InvalidParameter(f"games[{i}]: no roster data for one or both teams.")
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+            raise InvalidParameter(f"games[{i}]: repeats must be a positive integer.")
+        team1s.append(team1)
+        team2s.append(team2)
+        repeats.append(count)
+
+    if sum(repeats) > MAX_BATCH_GAMES:
+        raise InvalidParameter(f"A batch can simulate at most {MAX_BATCH_GAMES} games.")
+    return team1s, team2s, repeats
+
+def count_job_games(job, schedule, model):
+    """Record a pool job's games once it ends, counting only the seasons it completed."""
+    games_per_season = sum(schedule.values())
+    job.add_done_callback(lambda job: metrics.games_simulated(job.completed * games_per_season, model))
+
+def top_scorers(sampler, goals, assists, top=BATCH_TOP_SCORERS):
+    order = np.lexsort((-goals, -(goals + assists)))[:top]
+    return [
+        {"name": sampler.names[i], "goals": int(goals[i]), "assists": int(assists[i])}
+        for i in order if goals[i] + assists[i] > 0
+    ]
 
-    standings = sorted(results.items(), key=lambda x: (x[1]['points'], x[1]['wins']), reverse=True)
+# --- Routes ---
 
-    return jsonify({
-        "standings": [
-            {
-                "rank": i + 1,
-                "team": team,
-                "points": stats["points"],
-                "wins": stats["wins"],
-                "goal_diff": stats["goal_diff"],
-                "games_played": stats["games_played"],
-                "biggest_win": {
-                    "score": f"{stats['biggest_win'][0]}-{stats['biggest_win'][1]}",
-                    "opponent": stats["biggest_win"][2]
-                }
-            } for i, (team, stats) in enumerate(standings)
-        ]
-    })
+@app.route("/api/team-strengths", methods=["GET"])
+def get_team_strengths():
+    # force = request.args.get("force") == "1"
+    data = request_data()
+    return snapshot_json(data.fingerprint, lambda: data["strengths"])
+
+@app.route("/api/simulate-season", methods=["GET"])
+def simulate_season():
+    data = request_data()
+    teams = list(data["strengths"].keys())
+    strength_data = data["season_strengths"]
+
+    games_per_team = 82
+    seed = request_seed()
+
+    def compute():
+        results = play_regular_season(teams, strength_data, games_per_team, seed)
+        return {"standings": format_standings(results)}
+
+    return snapshot_json(data.fingerprint, lambda: cached_result(data, "simulate-season", {}, seed, compute), seed is not None)
+
+@app.route("/api/simulate-season/stream", methods=["GET"])
+def simulate_season_stream():
+    stream_format = request.args.get("format", default="ndjson")
+    snapshot_every = request_int("snapshot_every", default=7)
+    if stream_format not in ("ndjson", "sse"):
+        return jsonify({"error": "format must be ndjson or sse."}), 400
+    if snapshot_every < 1:
+        return jsonify({"error": "snapshot_every must be at least 1."}), 400
+
+    data = request_data()
+    teams = list(data["strengths"].keys())
+    strength_data = data["season_strengths"]
+    seed = request_seed()
+    schedule_seed, rng = season_streams(seed)
+    game_days = schedule_game_days(generate_fair_schedule(teams, 82, seed=schedule_seed), rng)
+
+    def encode(event, payload):
+        body = json.dumps({"type": event, **payload})
+        if stream_format == "sse":
+            return f"event: {event}\ndata: {body}\n\n"
+        return body + "\n"
+
+    def generate():
+        results = new_season_results(teams)
+        yield encode("start", {"teams": teams, "days": len(game_days)})
+
+        for day, games in enumerate(game_days, start=1):
+            played = []
+            for team1, team2 in games:
+                s1, s2, winner, is_tie = simulate_game(strength_data[team1], strength_data[team2], rng)
+                record_game(results, team1, team2, s1, s2, winner, is_tie)
+                played.append({
+                    "team1": team1,
+                    "team2": team2,
+                    "score1": int(s1),
+                    "score2": int(s2),
+                    "winner": team1 if winner == 1 else team2,
+                    "tie": bool(is_tie)
+                })
+            yield encode("day", {"day": day, "games": played})
+            metrics.games_simulated(len(games), "score")  # per delivered day, so a disconnect stops the count
+
+            if day % snapshot_every == 0 and day < len(game_days):
+                yield encode("standings", {"day": day, "standings": format_standings(results)})
+
+        yield encode("final", {"day": len(game_days), "standings": format_standings(results)})
+
+    mimetype = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return Response(stream_with_context(generate()), mimetype=mimetype,
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/api/playoffs", methods=["GET"])
+def playoffs_endpoint():
+    n_seasons = request_int("n")
+    if n_seasons is not None and (n_seasons < 1 or n_seasons > MAX_PLAYOFF_SEASONS):
+        return jsonify({"error": f"n must be between 1 and {MAX_PLAYOFF_SEASONS}."}), 400
+
+    data = request_data()
+    teams = list(data["strengths"].keys())
+    strength_data = data["season_strengths"]
+    model = playoff_model(data, teams)
+    seed = request_seed()
+
+    def compute_bracket():
+        # Same seed, same standings as /api/simulate-season
+        standings = format_standings(play_regular_season(teams, strength_data, 82, seed))
+        rank_of = {row["team"]: row["rank"] - 1 for row in standings}
+        ranks = [rank_of[team] for team in teams]
+
+        rounds, bracket = model.round_odds(ranks)
+        made = np.zeros(len(teams))
+        made[bracket_teams(bracket)] = 1
+        return {
+            "standings": standings,
+            "first_round": [
+                {"high_seed": high, "low_seed": low, "series_probability": round(p, 4)}
+                for high, low, p in model.first_round(ranks, bracket)
+            ],
+            "teams": odds_summary(teams, np.vstack([made, rounds]))
+        }
+
+    def compute_sampled():
+        home, away = expand_schedule(generate_fair_schedule(teams, 82, seed=seed), teams)
+        strength_values = np.array([strength_data[t] for t in teams], dtype=float)
+        odds = model.sampled_odds(strength_values, home, away, n_seasons, seed=seed)
+        metrics.games_simulated(n_seasons * len(home), "score")
+        return {"seasons": n_seasons, "teams": odds_summary(teams, odds)}
+
+    if n_seasons is None:
+        return snapshot_json(data.fingerprint, lambda: cached_result(data, "playoffs", {}, seed, compute_bracket), seed is not None)
+    return snapshot_json(data.fingerprint, lambda: cached_result(data, "playoffs", {"n": n_seasons}, seed, compute_sampled), seed is not None)
+
+@app.route("/api/simulate-seasons", methods=["GET"])
+def simulate_seasons_endpoint():
+    n_seasons = request_int("n", default=1000)
+    if n_seasons < 1 or n_seasons > MAX_SEASONS:
+        return jsonify({"error": f"n must be between 1 and {MAX_SEASONS}."}), 400
+
+    data = request_data()
+    teams = list(data["strengths"].keys())
+    strength_data = data["season_strengths"]
+
+    seed = request_seed()
+
+    def compute():
+        schedule = generate_fair_schedule(teams, 82, seed=seed)
+        if n_seasons >= PARALLEL_MIN_SEASONS and parallel.WORKERS > 1:
+            job = parallel.submit_seasons(teams, strength_data, schedule, n_seasons, seed=seed)
+            count_job_games(job, schedule, "score")
+            aggregate = job.result_or_raise()
+        else:
+            aggregate = simulate_seasons(teams, strength_data, schedule, n_seasons, seed=seed)
+            metrics.games_simulated(n_seasons * sum(schedule.values()), "score")
+
+        return {
+            "seasons": aggregate.seasons,
+            "teams": aggregate.summary(teams)
+        }
+
+    return snapshot_json(data.fingerprint, lambda: cached_result(data, "simulate-seasons", {"n": n_seasons}, seed, compute), seed is not None)
+
+@app.route("/api/simulate-seasons/jobs", methods=["POST"])
+def start_simulation_job():
+    body = request_body()
+    kind = body.get("kind", "seasons")
+    if kind not in ("seasons", "players"):
+        return jsonify({"error": "kind must be one of seasons, players."}), 400
+    limit = MAX_SEASONS if kind == "seasons" else MAX_PLAYER_SEASONS
+    n_seasons = body.get("n", 1000)
+    if not isinstance(n_seasons, int) or n_seasons < 1 or n_seasons > limit:
+        return jsonify({"error": f"n must be between 1 and {limit}."}), 400
+
+    data = request_data()
+    seed = request_seed()
+    if kind == "seasons":
+        teams = list(data["strengths"].keys())
+        schedule = generate_fair_schedule(teams, 82, seed=seed)
+        job = parallel.submit_seasons(teams, data["season_strengths"], schedule, n_seasons, seed=seed)
+    else:
+        samplers = roster_samplers(data)
+        teams = [team for team in data["strengths"] if team in samplers]
+        schedule = generate_fair_schedule(teams, 82, seed=seed)
+        job = parallel.submit_player_seasons(teams, data["strengths"], schedule, samplers, n_seasons, seed=seed)
+    count_job_games(job, schedule, "score" if kind == "seasons" else "goals")
+
+    return jsonify(job.to_dict()), 202
+
+@app.route("/api/simulate-seasons/jobs/<job_id>", methods=["GET"])
+def simulation_job_status(job_id):
+    job = parallel.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job."}), 404
+
+    response = job.to_dict()
+    if job.status == "finished":
+        if job.kind == "seasons":
+            response["teams"] = job.result.summary(job.teams)
+        else:
+            response["leaders"] = job.result.leaders(
+                top=request_top(len(job.result.names)),
+                sort=request.args.get("sort", default="points")
+            )
+    return jsonify(response)
+
+@app.route("/api/simulate-seasons/jobs/<job_id>", methods=["DELETE"])
+def cancel_simulation_job(job_id):
+    job = parallel.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job."}), 404
+    job.cancel()
+    return jsonify(job.to_dict())
+
+@app.route("/api/player-projections", methods=["GET"])
+def player_projections():
+    n_seasons = request_int("n", default=100)
+    sort = request.args.get("sort", default="points")
+    if n_seasons < 1 or n_seasons > MAX_PLAYER_SEASONS:
+        return jsonify({"error": f"n must be between 1 and {MAX_PLAYER_SEASONS}."}), 400
+    if sort not in ("points", "goals", "assists"):
+        return jsonify({"error": "sort must be one of points, goals, assists."}), 400
+
+    data = request_data()
+    strengths = data["strengths"]
+    samplers = roster_samplers(data)
+    teams = [team for team in strengths if team in samplers]
+    top = request_top(sum(len(samplers[team].names) for team in teams))
+
+    seed = request_seed()
+
+    def compute():
+        schedule = generate_fair_schedule(teams, 82, seed=seed)
+        stats = simulate_player_seasons(teams, strengths, schedule, samplers, n_seasons, seed=seed)
+        metrics.games_simulated(n_seasons * sum(schedule.values()), "goals")
+
+        return {
+            "seasons": stats.seasons,
+            "leaders": stats.leaders(top=top, sort=sort)
+        }
+
+    params = {"n": n_seasons, "top": top, "sort": sort}
+    return snapshot_json(data.fingerprint, lambda: cached_result(data, "player-projections", params, seed, compute), seed is not None)
 
 @app.route("/api/simulate-game", methods=["GET"])
 def simulate_game_endpoint():
-    strengths = load_or_generate_strengths()
+    strengths = request_data()["strengths"]
     teams = list(strengths.keys())
 
     if len(teams) < 2:
         return jsonify({"error": "Not enough teams to simulate a game."}), 400
 
-    team1, team2 = random.sample(teams, 2)
+    rng = np.random.default_rng(request_seed())
+    team1, team2 = (str(team) for team in rng.choice(teams, 2, replace=False))
     str1, str2 = strengths[team1], strengths[team2]
 
-    score1, score2, winner, is_tie = simulate_game(str1, str2)
+    score1, score2, winner, is_tie = simulate_game(str1, str2, rng)
+    metrics.games_simulated(1, "score")
 
     return jsonify({
         "team1": team1,
@@ -361,13 +666,30 @@ def simulate_game_endpoint():
         "tie": is_tie
     })
 
+@app.route("/api/head-to-head", methods=["GET"])
+def head_to_head_endpoint():
+    data = request_data()
+    table = head_to_head(data)
+    team1 = request.args.get("team1")
+    team2 = request.args.get("team2")
+    if team1 is None and team2 is None:
+        return snapshot_json(data.fingerprint, table.matrix)
+
+    if team1 not in table.index or team2 not in table.index:
+        return jsonify({"error": "One or both teams are invalid."}), 400
+    if team1 == team2:
+        return jsonify({"error": "Please select two different teams."}), 400
+
+    score_lines = request.args.get("scores", "1") != "0"
+    return snapshot_json(data.fingerprint, lambda: table.pair(team1, team2, score_lines=score_lines))
+
 @app.route("/api/simulate-specific-game", methods=["POST"])
 def simulate_specific_game():
     data = request.get_json()
     team1 = data.get("team1")
     team2 = data.get("team2")
 
-    strengths = load_or_generate_strengths()
+    strengths = request_data()["strengths"]
 
     if team1 not in strengths or team2 not in strengths:
         return jsonify({"error": "One or both teams are invalid."}), 400
@@ -377,7 +699,8 @@ def simulate_specific_game():
     str1 = strengths[team1]
     str2 = strengths[team2]
 
-    score1, score2, winner, is_tie = simulate_game(str1, str2)
+    score1, score2, winner, is_tie = simulate_game(str1, str2, np.random.default_rng(request_seed()))
+    metrics.games_simulated(1, "score")
 
     return jsonify({
         "team1": team1,
@@ -387,48 +710,186 @@ def simulate_specific_game():
         "winner": team1 if winner == 1 else team2,
         "tie": is_tie
     })
+@app.route("/api/simulate-games/batch", methods=["POST"])
+def simulate_games_batch():
+    """Many {team1, team2, repeats} matchups in one vectorized pass.
+
+    output=aggregate (default) returns win/tie counts and mean scores per
+    matchup; output=games returns each matchup's games as parallel score,
+    winner (1 or 2) and tie arrays. goals=true uses the goal-level model and
+    adds each side's top scorers to the aggregates; its scores are
+    regulation goals, as /api/simulate-specific-game-with-goals reports.
+    """
+    body = request_body()
+    output = body.get("output", "aggregate")
+    goal_model = body.get("goals", False)
+    if output not in ("aggregate", "games"):
+        return jsonify({"error": "output must be aggregate or games."}), 400
+    if not isinstance(goal_model, bool):
+        return jsonify({"error": "goals must be true or false."}), 400
+
+    data = request_data()
+    strengths = data["strengths"]
+    samplers = roster_samplers(data) if goal_model else None
+    team1s, team2s, repeats = batch_matchups(body, strengths, samplers)
+    seed = request_seed()
+
+    def compute():
+        rng = np.random.default_rng(seed)
+        str1 = [strengths[t] for t in team1s]
+        str2 = [strengths[t] for t in team2s]
+        game_fn = simulate_goal_games if goal_model else simulate_games
+        matchup, score1, score2, winner, tie = simulate_matchups(str1, str2, repeats, rng, game_fn=game_fn)
+
+        metrics.games_simulated(len(matchup), "goals" if goal_model else "score")
+
+        bounds = np.cumsum([0] + repeats)
+        if output == "games":
+            return {"matchups": [
+                {
+                    "team1": team1,
+                    "team2": team2,
+                    "score1": score1[start:end].tolist(),
+                    "score2": score2[start:end].tolist(),
+                    "winner": winner[start:end].tolist(),
+                    "tie": tie[start:end].tolist()
+                } for team1, team2, start, end in zip(team1s, team2s, bounds[:-1], bounds[1:])
+            ]}
+
+        n = len(repeats)
+        wins1 = np.bincount(matchup, weights=winner == 1, minlength=n)
+        ties = np.bincount(matchup, weights=tie, minlength=n)
+        total1 = np.bincount(matchup, weights=score1, minlength=n)
+        total2 = np.bincount(matchup, weights=score2, minlength=n)
+        if goal_model:
+            ot1, ot2 = (np.bincount(matchup, weights=ot, minlength=n) for ot in ot_goals(winner, tie))
+
+        results = []
+        for k, (team1, team2, games) in enumerate(zip(team1s, team2s, repeats)):
+            result = {
+                "team1": team1,
+                "team2": team2,
+                "games": games,
+                "wins1": int(wins1[k]),
+                "wins2": games - int(wins1[k]),
+                "ties": int(ties[k]),
+                "mean_score1": round(total1[k] / games, 3),
+                "mean_score2": round(total2[k] / games, 3)
+            }
+            if goal_model:
+                # Scorers are drawn for every goal, the OT winner included
+                for side, team, total in (("1", team1, total1[k] + ot1[k]), ("2", team2, total2[k] + ot2[k])):
+                    goals, assists = player_goal_counts(samplers[team], int(total), rng)
+                    result["top_scorers" + side] = top_scorers(samplers[team], goals, assists)
+            results.append(result)
+        return {"matchups": results}
+
+    params = {"games": list(zip(team1s, team2s, repeats)), "output": output, "goals": goal_model}
+    return jsonify(serialization.shape(cached_result(data, "simulate-games-batch", params, seed, compute)))
+
 @app.route("/api/simulate-specific-game-with-goals", methods=["POST"])
 def simulate_with_goal_details():
     data = request.get_json()
     team1 = data.get("team1")
     team2 = data.get("team2")
 
-    strengths = load_or_generate_strengths()
+    data = request_data()
+    strengths = data["strengths"]
 
     if team1 not in strengths or team2 not in strengths:
         return jsonify({"error": "One or both teams are invalid."}), 400
 
-    with open(PLAYER_RATINGS_FILE, "r") as f:
-        player_data = json.load(f)
-
-    players1 = player_data.get(team1, [])
-    players2 = player_data.get(team2, [])
-
-    result = simulate_game_with_scorers(strengths[team1], strengths[team2], players1, players2)
-
-    return jsonify({
-        "team1": team1,
-        "team2": team2,
-        "score1": result["score1"],
-        "score2": result["score2"],
-        "winner": team1 if result["winner"] == 1 else team2,
-        "tie": result["tie"],
-        "goals_team1": result["goals_team1"],
-        "goals_team2": result["goals_team2"]
-    })
+    samplers = roster_samplers(data)
+    if team1 not in samplers or team2 not in samplers:
+        return jsonify({"error": "No roster data for one or both teams."}), 400
+
+    seed = request_seed()
+
+    def compute():
+        rng = np.random.default_rng(seed)
+        result = simulate_game_with_scorers(strengths[team1], strengths[team2], samplers[team1], samplers[team2], rng)
+        metrics.games_simulated(1, "goals")
+
+        return {
+            "team1": team1,
+            "team2": team2,
+            "score1": result["score1"],
+            "score2": result["score2"],
+            "winner": team1 if result["winner"] == 1 else team2,
+            "tie": result["tie"],
+            "goals_team1": result["goals_team1"],
+            "goals_team2": result["goals_team2"]
+        }
+
+    params = {"team1": team1, "team2": team2}
+    return jsonify(serialization.shape(cached_result(data, "simulate-specific-game-with-goals", params, seed, compute)))
+
+@app.route("/api/what-if/scenarios", methods=["POST"])
+def create_scenario():
+    """Start a what-if scenario from the current data, optionally with a first list of moves.
+
+    Every simulation route then runs under the scenario's rosters and
+    strengths when given scenario=<id> in the query string or JSON body.
+    """
+    scenario = scenarios.create(request_body().get("moves", []))
+    return jsonify(scenario.summary()), 201
+
+@app.route("/api/what-if/scenarios/<scenario_id>", methods=["GET"])
+def scenario_status(scenario_id):
+    return jsonify(scenarios.get(scenario_id).summary())
+
+@app.route("/api/what-if/scenarios/<scenario_id>/moves", methods=["POST"])
+def scenario_moves(scenario_id):
+    scenario = scenarios.apply(scenario_id, request_body().get("moves", []))
+    return jsonify(scenario.summary())
+
+@app.route("/api/what-if/scenarios/<scenario_id>", methods=["DELETE"])
+def delete_scenario(scenario_id):
+    scenarios.delete(scenario_id)
+    return "", 204
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics_endpoint():
+    if not metrics.ENABLED:
+        return jsonify({"error": "Metrics are disabled; set METRICS_ENABLED=1."}), 404
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/profiles/<profile_id>", methods=["GET"])
+def profile_report(profile_id):
+    fmt = request.args.get("format", default="text")
+    if not profiling.ENABLED:
+        return jsonify({"error": "Profiling is disabled; set PROFILING_ENABLED=1."}), 404
+    if fmt not in profiling.FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(profiling.FORMATS)}."}), 400
+
+    path = profiling.report_path(profile_id, fmt)
+    if path is None:
+        return jsonify({"error": "Unknown profile or format not recorded for it."}), 404
+    if fmt == "pstats":
+        return send_file(os.path.abspath(path), mimetype="application/octet-stream", as_attachment=True)
+    return send_file(os.path.abspath(path), mimetype="text/plain")
 
 # default landing page
 @app.route("/")
 def index():
-    return send_file("index.html")
+    return send_cached("index.html")
 
 @app.route("/teams")
 def teams():
-    return send_file("teams.html")
+    return send_cached("teams.html")
 
 @app.route("/rosters")
 def roster():
-    return send_file("roster.html")
+    return send_cached("roster.html")
+
+def serve_static(filename):
+    path = safe_join(app.static_folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    return send_cached(path)
+
+# Logos and data files get ETags, cache policies and precompressed variants
+app.view_functions["static"] = serve_static
 
 if __name__ == "__main__":
     app.run(debug=True)
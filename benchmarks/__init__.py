@@ -0,0 +1,9 @@
+"""Timing and memory benchmarks for the simulation and rating hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run --save        # record benchmarks/baseline.json
+    python -m benchmarks.run               # compare, exit 1 on regression
+    python -m benchmarks.run -k schedule   # only matching cases
+    python -m benchmarks.run --require-baseline  # CI: also exit 1 without a baseline
+"""
@@ -0,0 +1,154 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import app
+import calculate_team_ratings
+import create_ratings
+import http_cache
+import schedule
+from league import EAST, WEST
+from result_cache import ResultCache
+from samplers import RosterSampler
+from season_engine import simulate_seasons
+from shared_cache import SharedFileCache
+
+SEED = 1234
+LEAGUE_SIZES = (32, 64, 128)
+ROSTER_SIZES = (25, 60)
+POSITIONS = ["C", "L", "R", "D", "G"]
+
+# --- Synthetic leagues ---
+
+def synthetic_teams(n_teams):
+    # 32 teams use the real division layout so the league schedule path is covered
+    if n_teams == len(EAST + WEST):
+        return EAST + WEST
+    return [f"T{i:03d}" for i in range(n_teams)]
+
+def synthetic_strengths(teams, seed=SEED):
+    rng = np.random.default_rng(seed)
+    return dict(zip(teams, np.round(rng.uniform(0.55, 1.0, len(teams)), 3).tolist()))
+
+def synthetic_rosters(teams, roster_size, seed=SEED):
+    rng = np.random.default_rng(seed)
+    next_id = iter(range(8400000, 8400000 + len(teams) * roster_size))
+    return {
+        team: [
+            {
+                "id": next(next_id),
+                "name": f"{team} Player {i}",
+                "position": POSITIONS[i % len(POSITIONS)],
+                "rating": int(rating)
+            } for i, rating in enumerate(rng.integers(60, 100, roster_size))
+        ] for team in teams
+    }
+
+def synthetic_player_stats(teams, roster_size, seed=SEED):
+    rng = np.random.default_rng(seed)
+    stats = {}
+    for team in teams:
+        players = []
+        for i in range(roster_size):
+            goals, assists = (int(v) for v in rng.poisson([12, 18]))
+            players.append({
+                "id": len(stats) * roster_size + i,
+                "name": f"{team} Player {i}",
+                "position": POSITIONS[i % len(POSITIONS)],
+                "goals": goals,
+                "assists": assists,
+                "points": goals + assists,
+                "plusMinus": int(rng.integers(-20, 21)),
+                "shots": int(rng.poisson(120)),
+                "shootingPctg": float(rng.uniform(0.02, 0.2)),
+                "avgTimeOnIcePerGame": float(rng.uniform(600, 1500)),
+                "faceoffWinPctg": float(rng.uniform(0, 0.6))
+            })
+        stats[team] = players
+    return stats
+
+# --- Cases ---
+# Each case is (name, factory); the factory does the untimed setup and
+# returns the zero-argument callable that is timed.
+
+def bench_simulate_game():
+    rng = np.random.default_rng(SEED)
+    return lambda: app.simulate_game(0.82, 0.74, rng)
+
+def bench_simulate_game_with_scorers(roster_size):
+    def factory():
+        rng = np.random.default_rng(SEED)
+        rosters = synthetic_rosters(["HOME", "AWAY"], roster_size)
+        home, away = RosterSampler(rosters["HOME"]), RosterSampler(rosters["AWAY"])
+        return lambda: app.simulate_game_with_scorers(0.82, 0.74, home, away, rng)
+    return factory
+
+def bench_generate_fair_schedule(n_teams):
+    def factory():
+        teams = synthetic_teams(n_teams)
+
+        def run():
+            # Drop the memoized schedule so the construction itself is timed
+            schedule._cached_schedule.cache_clear()
+            schedule.generate_fair_schedule(teams, 82, seed=SEED)
+        return run
+    return factory
+
+def bench_regular_season(n_teams):
+    def factory():
+        teams = synthetic_teams(n_teams)
+        strengths = synthetic_strengths(teams)
+        return lambda: app.play_regular_season(teams, strengths, 82, SEED)
+    return factory
+
+def bench_simulate_season_route():
+    # Private caches, so a run never empties a shared RESULT_CACHE_DIR or
+    # rewrites the tracked team_strengths.json
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+    app.result_cache = ResultCache()
+    app.strength_cache = SharedFileCache(os.path.join(workdir, app.CACHE_FILE), app.CACHE_TTL_SECONDS,
+                                         app.generate_strengths, sources=[app.TEAM_RATINGS_FILE])
+    client = app.app.test_client()
+
+    def run():
+        # Both the simulated result and its encoded body are cached per seed
+        app.result_cache.clear()
+        http_cache.clear()
+        response = client.get(f"/api/simulate-season?seed={SEED}")
+        assert response.status_code == 200
+    return run
+
+def bench_simulate_seasons(n_teams, n_seasons=100):
+    def factory():
+        teams = synthetic_teams(n_teams)
+        strengths = synthetic_strengths(teams)
+        matchups = schedule.generate_fair_schedule(teams, 82, seed=SEED)
+        return lambda: simulate_seasons(teams, strengths, matchups, n_seasons, seed=SEED)
+    return factory
+
+def bench_create_ratings(n_teams, roster_size):
+    def factory():
+        stats = synthetic_player_stats(synthetic_teams(n_teams), roster_size)
+        return lambda: create_ratings.compute_ratings(stats)
+    return factory
+
+def bench_team_ratings(n_teams, roster_size):
+    def factory():
+        rosters = synthetic_rosters(synthetic_teams(n_teams), roster_size)
+        return lambda: calculate_team_ratings.compute_team_ratings(rosters)
+    return factory
+
+CASES = [("simulate_game", bench_simulate_game), ("simulate_season_route", bench_simulate_season_route)]
+CASES += [(f"simulate_game_with_scorers[{size}]", bench_simulate_game_with_scorers(size)) for size in ROSTER_SIZES]
+CASES += [(f"generate_fair_schedule[{n}]", bench_generate_fair_schedule(n)) for n in LEAGUE_SIZES]
+CASES += [(f"regular_season[{n}]", bench_regular_season(n)) for n in LEAGUE_SIZES]
+CASES += [(f"simulate_seasons_x100[{n}]", bench_simulate_seasons(n)) for n in (32, 128)]
+CASES += [
+    (f"{name}[{n}x{size}]", bench(n, size))
+    for name, bench in (("create_ratings", bench_create_ratings), ("team_ratings", bench_team_ratings))
+    for n in LEAGUE_SIZES for size in ROSTER_SIZES
+]
@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.cases import CASES
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25  # allowed slowdown / memory growth before a case counts as regressed
+
+def measure(fn, repeat=5, min_time=0.2):
+    """Best-of-`repeat` ops/sec, plus the peak traced allocation of one call in KiB."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number))
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ops_per_sec": round(number / best, 2), "peak_kib": round(peak / 1024, 1)}
+
+def run_cases(pattern=None, repeat=5, min_time=0.2):
+    results = {}
+    for name, factory in CASES:
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(factory(), repeat, min_time)
+        print(f"{name:<40} {results[name]['ops_per_sec']:>12,.2f} ops/s {results[name]['peak_kib']:>12,.1f} KiB")
+    return results
+
+def compare(results, baseline, threshold):
+    """Names of cases that got slower or hungrier than the baseline by more than `threshold`."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        slower = result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold)
+        # Small allocations are noisy; only flag growth past 64 KiB
+        hungrier = result["peak_kib"] > max(base["peak_kib"] * (1 + threshold), base["peak_kib"] + 64)
+        if slower or hungrier:
+            regressions.append(name)
+            print(f"❌ {name}: {result['ops_per_sec']:,.2f} ops/s, {result['peak_kib']:,.1f} KiB "
+                  f"(baseline {base['ops_per_sec']:,.2f} ops/s, {base['peak_kib']:,.1f} KiB)")
+    return regressions
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_baseline(path, results, previous=None):
+    # Filtered runs only replace the cases they measured
+    merged = dict(previous["results"]) if previous else {}
+    merged.update(results)
+    with open(path, "w") as f:
+        json.dump({
+            "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "results": merged
+        }, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the simulation and rating hot paths against a stored baseline.")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing repeat")
+    parser.add_argument("--save", action="store_true", help="record this run as the new baseline")
+    parser.add_argument("--require-baseline", action="store_true",
+                        help="fail when there is no baseline to compare against (for CI)")
+    args = parser.parse_args()
+
+    results = run_cases(args.pattern, args.repeat, args.min_time)
+    baseline = load_baseline(args.baseline)
+
+    if args.save:
+        save_baseline(args.baseline, results, baseline)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return 0
+    if baseline is None:
+        if args.require_baseline:
+            print(f"❌ No baseline at {args.baseline}; record one with --save before comparing")
+            return 1
+        print(f"⚠️ No baseline at {args.baseline}; run with --save to record one")
+        return 0
+
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    print(f"✅ No regressions against the baseline from {baseline['recorded']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
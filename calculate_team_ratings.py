@@ -15,10 +15,7 @@ def scale_softened(avg_rating, min_input, max_input, exponent=EXPONENT):
     normalized = (transformed - min_trans) / (max_trans - min_trans)
     return round(MIN_RATING + normalized * (MAX_RATING - MIN_RATING))
 
-def main():
-    with open("team_rosters.json", "r") as f:
-        rosters = json.load(f)
-
+def compute_team_ratings(rosters):
     team_averages = {}
     for team, players in rosters.items():
         if not players:
@@ -35,6 +32,13 @@ def main():
     team_ratings = {}
     for team, avg in team_averages.items():
         team_ratings[team] = scale_softened(avg, min_avg, max_avg)
+    return team_ratings
+
+def main():
+    with open("team_rosters.json", "r") as f:
+        rosters = json.load(f)
+
+    team_ratings = compute_team_ratings(rosters)
 
     with open("team_ratings.json", "w") as f:
         json.dump(team_ratings, f, indent=2)
@@ -1,31 +1,11 @@
+import argparse
 import json
+import numpy as np
 
-# Load data
-with open("player_ratings.json", "r") as f:
-    data = json.load(f)
-
-# Collect stat categories for normalization
-goals, assists, points, plus_minus = [], [], [], []
-shots, shooting_pctg, toi, faceoff_pctg = [], [], [], []
-
-# Gather all values for normalization
-for team_players in data.values():
-    for player in team_players:
-        goals.append(player.get("goals", 0))
-        assists.append(player.get("assists", 0))
-        points.append(player.get("points", 0))
-        plus_minus.append(player.get("plusMinus", 0))
-        shots.append(player.get("shots", 0))
-        shooting_pctg.append(player.get("shootingPctg", 0))
-        toi.append(player.get("avgTimeOnIcePerGame", 0))
-        faceoff_pctg.append(player.get("faceoffWinPctg", 0))
-
-def normalize(value, values):
-    min_v, max_v = min(values), max(values)
-    return 0 if max_v == min_v else (value - min_v) / (max_v - min_v)
-
-def scale_rating(value):
-    return round(75 + value * 25)
+import snapshot_store
+
+INPUT_FILE = "player_ratings.json"
+OUTPUT_FILE = "normalized_player_ratings.json"
 
 # Define stat weights
 weights = {
@@ -39,36 +19,118 @@ weights = {
     "faceoffWinPctg": 0.05
 }
 
-# Generate ratings with team and jersey number
-ratings = {}
-
-for team, team_players in data.items():
-    ratings[team] = []
-    for player in team_players:
-        score = 0
-        score += weights["goals"] * normalize(player.get("goals", 0), goals)
-        score += weights["assists"] * normalize(player.get("assists", 0), assists)
-        score += weights["points"] * normalize(player.get("points", 0), points)
-        score += weights["plusMinus"] * normalize(player.get("plusMinus", 0), plus_minus)
-        score += weights["shots"] * normalize(player.get("shots", 0), shots)
-        score += weights["shootingPctg"] * normalize(player.get("shootingPctg", 0), shooting_pctg)
-        score += weights["avgTimeOnIcePerGame"] * normalize(player.get("avgTimeOnIcePerGame", 0), toi)
-        score += weights["faceoffWinPctg"] * normalize(player.get("faceoffWinPctg", 0), faceoff_pctg)
-
-        overall = scale_rating(score)
-
-        ratings[team].append({
+STAT_FIELDS = list(weights)
+
+# --- Normalizers: map each stat column onto [0, 1] ---
+
+def minmax(columns):
+    low, high = columns.min(axis=0), columns.max(axis=0)
+    span = high - low
+    return np.where(span == 0, 0.0, (columns - low) / np.where(span == 0, 1, span))
+
+def percentile(columns):
+    # Share of the league below each value, ties counted as half
+    n = len(columns)
+    if n < 2:
+        return np.zeros_like(columns)
+    ordered = np.sort(columns, axis=0)
+    result = np.empty_like(columns)
+    for j in range(columns.shape[1]):
+        below = np.searchsorted(ordered[:, j], columns[:, j], side="left")
+        at_or_below = np.searchsorted(ordered[:, j], columns[:, j], side="right")
+        result[:, j] = (below + at_or_below - 1) / 2 / (n - 1)
+    return result
+
+def zscore(columns):
+    # +/- 3 standard deviations spread over [0, 1]
+    std = columns.std(axis=0)
+    z = (columns - columns.mean(axis=0)) / np.where(std == 0, 1, std)
+    return np.clip((z + 3) / 6, 0, 1)
+
+NORMALIZERS = {"minmax": minmax, "percentile": percentile, "zscore": zscore}
+
+def normalize_columns(columns, positions=None, method="minmax", by_position=False):
+    normalizer = NORMALIZERS[method]
+    if not by_position:
+        return normalizer(columns)
+
+    positions = np.asarray(positions)
+    result = np.empty_like(columns)
+    for position in np.unique(positions):
+        rows = positions == position
+        result[rows] = normalizer(columns[rows])
+    return result
+
+# --- Columnar loading and scoring ---
+
+def load_columns(data):
+    """Flatten {team: [players]} into row metadata plus a (players x stats) float matrix."""
+    rows = [(team, player) for team, players in data.items() for player in players]
+    columns = np.array(
+        [[player.get(field, 0) or 0 for field in STAT_FIELDS] for _, player in rows],
+        dtype=float
+    ).reshape(len(rows), len(STAT_FIELDS))
+    return rows, columns
+
+def weight_vector(stat_weights=None):
+    stat_weights = stat_weights or weights
+    return np.array([stat_weights[field] for field in STAT_FIELDS], dtype=float)
+
+def scale_ratings(scores):
+    return np.rint(75 + scores * 25).astype(int)
+
+def load_snapshot_columns(table):
+    """Same as load_columns, but reads the stat columns straight from a memory-mapped snapshot."""
+    teams, ids, names, positions = (table.values(key) for key in ("team", "id", "name", "position"))
+    rows = [
+        (team, {"id": pid, "name": name, "position": position})
+        for team, pid, name, position in zip(teams, ids, names, positions)
+    ]
+    columns = np.column_stack([np.nan_to_num(table.column(field)) for field in STAT_FIELDS])
+    return rows, columns
+
+def rate_columns(rows, columns, method="minmax", by_position=False, stat_weights=None):
+    positions = [player["position"] for _, player in rows]
+    normalized = normalize_columns(columns, positions, method, by_position)
+    overall = scale_ratings(normalized @ weight_vector(stat_weights))
+
+    # Generate ratings with team and jersey number
+    ratings = {}
+    for (team, player), rating in zip(rows, overall):
+        ratings.setdefault(team, []).append({
             "id": player["id"],
             "name": player["name"],
             "team": team,
             "position": player["position"],
-            "rating": overall
+            "rating": int(rating)
         })
+    return ratings
+
+def compute_ratings(data, method="minmax", by_position=False, stat_weights=None):
+    rows, columns = load_columns(data)
+    ratings = rate_columns(rows, columns, method, by_position, stat_weights)
+    return {team: ratings.get(team, []) for team in data}
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate every player from weighted, normalized stats.")
+    parser.add_argument("--normalizer", choices=sorted(NORMALIZERS), default="minmax")
+    parser.add_argument("--by-position", action="store_true", help="normalize within each position group")
+    args = parser.parse_args()
+
+    table = snapshot_store.load_table("player_stats")
+    if table is not None:
+        rows, columns = load_snapshot_columns(table)
+        ratings = rate_columns(rows, columns, args.normalizer, args.by_position)
+    else:
+        with open(INPUT_FILE, "r") as f:
+            data = json.load(f)
+        ratings = compute_ratings(data, args.normalizer, args.by_position)
 
-        
+    # Save to file
+    with open(OUTPUT_FILE, "w") as f:
+        json.dump(ratings, f, indent=2)
 
-# Save to file
-with open("normalized_player_ratings.json", "w") as f:
-    json.dump(ratings, f, indent=2)
+    print(f"✅ Player ratings (with team + jersey number) saved to {OUTPUT_FILE}")
 
-print("✅ Player ratings (with team + jersey number) saved to normalized_player_ratings.json")
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,21 @@
 import json
 
+def build_roster(players):
+    return [
+        {
+            "id": player["id"],
+            "name": player["name"],
+            "position": player["position"],
+            #"number" :  player["number"],
+            "rating": player["rating"]
+        } for player in players
+    ]
+
 def main():
     with open("normalized_player_ratings.json", "r") as f:
         team_data = json.load(f)
 
-    rosters = {}
-
-    for team, players in team_data.items():
-        rosters[team] = []
-        for player in players:
-            rosters[team].append({
-                "id": player["id"],
-                "name": player["name"],
-                "position": player["position"],
-                #"number" :  player["number"],
-                "rating": player["rating"]
-            })
+    rosters = {team: build_roster(players) for team, players in team_data.items()}
 
     with open("team_rosters.json", "w") as f:
         json.dump(rosters, f, indent=2)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+def load_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+def _content_hash(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+class Snapshot:
+    """Immutable view of every registered data set at one registry version."""
+
+    def __init__(self, version, data, versions, hashes):
+        self.version = version
+        self.data = data
+        self.versions = versions
+        self.hashes = hashes
+        self.fingerprint = hashlib.sha256(
+            "".join(hashes[name] for name in sorted(hashes)).encode()
+        ).hexdigest()[:16]
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+class DataRegistry:
+    """Loads each data file once and reloads it when the pipeline rewrites it.
+
+    File mtimes are checked at most every `check_interval` seconds. A change
+    reloads only the affected sources and swaps in a new Snapshot, so readers
+    always see a consistent set of data and the request path does no file I/O
+    between checks.
+
+    Touching the optional `stamp` file makes the next check in every
+    process re-run every loader, as a refresh(force=True) would.
+    """
+
+    def __init__(self, check_interval=2.0, on_load=None, stamp=None, on_reload=None):
+        self.check_interval = check_interval
+        self.on_load = on_load  # on_load(name, seconds) after each successful loader call
+        self.on_reload = on_reload  # on_reload(previous, snapshot) after a reload replaces a snapshot
+        self.stamp = stamp
+        self._stamp_signature = _signature([stamp]) if stamp else None
+        self._sources = {}
+        self._signatures = {}
+        self._loaded_at = {}
+        self._snapshot = Snapshot(0, {}, {}, {})
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def register(self, name, paths, loader, max_age=None):
+        self._sources[name] = (list(paths), loader, max_age)
+        self._next_check = 0.0
+
+    def snapshot(self):
+        if time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._snapshot
+
+    def get(self, name):
+        return self.snapshot()[name]
+
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            current = self._snapshot
+            data = dict(current.data)
+            versions = dict(current.versions)
+            hashes = dict(current.hashes)
+            changed = False
+            if self.stamp:
+                stamp_signature = _signature([self.stamp])
+                force = force or stamp_signature != self._stamp_signature
+                self._stamp_signature = stamp_signature
+
+            for name, (paths, loader, max_age) in self._sources.items():
+                signature = _signature(paths)
+                expired = max_age is not None and now - self._loaded_at.get(name, 0) >= max_age
+                if not force and name in data and not expired and signature == self._signatures.get(name):
+                    continue
+
+                try:
+                    started = time.perf_counter()
+                    value = loader()
+                    if self.on_load:
+                        self.on_load(name, time.perf_counter() - started)
+                except (OSError, ValueError) as e:
+                    if name not in data:
+                        raise
+                    # Likely caught a file mid-rewrite; keep serving the old data
+                    print(f"⚠️ Reload of {name} failed, keeping previous version: {e}")
+                    continue
+                content_hash = _content_hash(value)
+                self._signatures[name] = _signature(paths)
+                self._loaded_at[name] = now
+                if hashes.get(name) == content_hash:
+                    continue
+
+                data[name] = value
+                hashes[name] = content_hash
+                versions[name] = versions.get(name, 0) + 1
+                changed = True
+
+            if changed:
+                self._snapshot = Snapshot(current.version + 1, data, versions, hashes)
+            self._next_check = now + self.check_interval
+            snapshot = self._snapshot
+
+        if self.on_reload and snapshot is not current and current.version:
+            self.on_reload(current, snapshot)
+        return snapshot
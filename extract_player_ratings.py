@@ -9,28 +9,33 @@ FIELDS_TO_KEEP = [
     "avgTimeOnIcePerGame", "faceoffWinPctg"
 ]
 
-def extract_relevant_stats():
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        raw_data = json.load(f)
+def extract_team(team_data):
+    skaters = team_data.get("skaters", [])
+    players = []
+
+    for player in skaters:
+        simplified_player = {
+            "id": player["playerId"],
+            "name": f"{player['firstName']['default']} {player['lastName']['default']}",
+            "position": player.get("positionCode", "")
+        }
 
-    cleaned_data = {}
+        for field in FIELDS_TO_KEEP:
+            if field not in simplified_player:
+                simplified_player[field] = player.get(field)
 
-    for team_abbr, team_data in raw_data.items():
-        skaters = team_data.get("skaters", [])
-        cleaned_data[team_abbr] = []
+        players.append(simplified_player)
 
-        for player in skaters:
-            simplified_player = {
-                "id": player["playerId"],
-                "name": f"{player['firstName']['default']} {player['lastName']['default']}",
-                "position": player.get("positionCode", "")
-            }
+    return players
 
-            for field in FIELDS_TO_KEEP:
-                if field not in simplified_player:
-                    simplified_player[field] = player.get(field)
+def extract_relevant_stats():
+    with open(INPUT_FILE, "r", encoding="utf-8") as f:
+        raw_data = json.load(f)
 
-            cleaned_data[team_abbr].append(simplified_player)
+    cleaned_data = {
+        team_abbr: extract_team(team_data)
+        for team_abbr, team_data in raw_data.items()
+    }
 
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
         json.dump(cleaned_data, f, indent=2)
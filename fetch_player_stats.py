@@ -1,6 +1,4 @@
-import requests
-import json
-import time
+from nhl_fetcher import fetch_into
 
 TEAM_ABBRS = [
     "ANA", "UTA", "BOS", "BUF", "CAR", "CBJ", "CGY", "CHI", "COL", "DAL", "DET",
@@ -12,27 +10,12 @@ SEASON = "20242025"
 GAME_TYPE = "2"  # Regular season
 OUTPUT_FILE = "team_stats.json"
 
-def fetch_team_stats(team_abbr):
-    url = f"https://api-web.nhle.com/v1/club-stats/{team_abbr}/{SEASON}/{GAME_TYPE}"
-    print(f"Fetching {team_abbr} stats from: {url}")
-    try:
-        res = requests.get(url)
-        res.raise_for_status()
-        return res.json()
-    except requests.RequestException as e:
-        print(f"❌ Failed to fetch data for {team_abbr}: {e}")
-        return None
+def team_stats_url(team_abbr):
+    return f"https://api-web.nhle.com/v1/club-stats/{team_abbr}/{SEASON}/{GAME_TYPE}"
 
 def main():
-    all_stats = {}
-    for team in TEAM_ABBRS:
-        data = fetch_team_stats(team)
-        if data:
-            all_stats[team] = data
-        time.sleep(1)  # Light rate limiting
-
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(all_stats, f, indent=2)
+    urls = {team: team_stats_url(team) for team in TEAM_ABBRS}
+    fetch_into(OUTPUT_FILE, urls)
     print(f"\n✅ Saved team stats to {OUTPUT_FILE}")
 
 if __name__ == "__main__":
@@ -0,0 +1,54 @@
+import os
+import tempfile
+
+# gunicorn -c gunicorn.conf.py
+#
+# The app is imported and its data preloaded once in the master (see
+# wsgi.create_app); workers fork from it and share that memory. Data
+# changes are picked up by each worker's registry check, or all at once
+# with `python wsgi.py --reload`.
+#
+# GUNICORN_WORKER_CLASS=gevent (requires gevent) serves many slow requests
+# per worker; simulations then run on gevent's thread pool so cheap routes
+# such as /api/team-strengths keep answering. The default gthread workers
+# get the same effect from their request threads.
+#
+# With METRICS_ENABLED=1 each worker counts only its own requests, so the
+# workers share their samples through METRICS_DIR (a per-port directory
+# under the temp dir unless set) and any worker's /api/metrics reports the
+# whole server. The directory is emptied when the master starts.
+
+wsgi_app = "wsgi:application"
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+preload_app = True
+
+# Simulations are CPU-bound, so one worker per core
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))
+
+# Large season batches and playoff samples can take a while
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+if os.environ.get("METRICS_ENABLED", "0") == "1":
+    os.environ.setdefault("METRICS_DIR", os.path.join(
+        tempfile.gettempdir(), f"sim-metrics-{bind.rsplit(':', 1)[-1]}"
+    ))
+
+def on_starting(server):
+    import metrics
+    metrics.reset_shared()
+
+def when_ready(server):
+    import metrics
+    metrics.flush_preloaded()
+
+def worker_exit(server, worker):
+    import metrics
+    metrics.flush(final=True)
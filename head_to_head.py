@@ -0,0 +1,107 @@
+import math
+import numpy as np
+
+from season_engine import BASE_RATE, BLOWOUT_SCORE, MAX_SCORE, UPSET_CHANCE, blowout_chance
+
+LOW_SCORES = slice(0, 3)   # loser's score in blowouts and upsets, uniform 0-2
+UPSET_SCORES = slice(4, 6)  # underdog's score in upsets, uniform 4-5
+
+def score_distribution(rates):
+    """P(min(Poisson(rate), MAX_SCORE) = k) for k = 0..MAX_SCORE, one row per rate."""
+    rates = np.asarray(rates, dtype=float)[:, None]
+    k = np.arange(MAX_SCORE)
+    log_factorial = np.array([math.lgamma(i + 1) for i in k])
+    pmf = np.exp(k * np.log(np.maximum(rates, 1e-300)) - rates - log_factorial)
+    return np.column_stack([pmf, np.clip(1 - pmf.sum(axis=1), 0, 1)])
+
+class HeadToHead:
+    """Exact outcome distributions of simulate_game for every ordered pair of teams.
+
+    The game model is a mixture: a blowout with probability
+    blowout_chance(s1, s2), otherwise an upset for the weaker team with
+    probability UPSET_CHANCE, otherwise independent capped Poisson scores
+    where a tie goes to the stronger team (coin flip if equal) in OT.
+    All (teams x teams x scores x scores) score-line probabilities are
+    computed up front so lookups are plain indexing.
+    """
+
+    def __init__(self, teams, strengths):
+        self.teams = list(teams)
+        self.index = {team: i for i, team in enumerate(self.teams)}
+        s = np.array([strengths[t] for t in self.teams], dtype=float)
+        s1, s2 = s[:, None], s[None, :]
+
+        pmf = score_distribution(BASE_RATE * s)
+        regulation = pmf[:, None, :, None] * pmf[None, :, None, :]
+
+        blowout = blowout_chance(s1, s2)
+        upset = (1 - blowout) * UPSET_CHANCE * (s1 != s2)
+        plain = 1 - blowout - upset
+        stronger1 = s1 > s2
+
+        scores = plain[..., None, None] * regulation
+        low = 1 / 3
+        scores[..., BLOWOUT_SCORE, LOW_SCORES] += (blowout * stronger1)[..., None] * low
+        scores[..., LOW_SCORES, BLOWOUT_SCORE] += (blowout * ~stronger1)[..., None] * low
+        scores[..., UPSET_SCORES, LOW_SCORES] += (upset * (s1 < s2))[..., None, None] * low / 2
+        scores[..., LOW_SCORES, UPSET_SCORES] += (upset * (s2 < s1))[..., None, None] * low / 2
+        self.scores = scores
+
+        # Blowout and upset lines are never level, so every tie is a regulation tie
+        upper = np.triu(np.ones((MAX_SCORE + 1, MAX_SCORE + 1), dtype=bool), 1)
+        self.tie = np.trace(scores, axis1=2, axis2=3)
+        self.regulation_win1 = scores[..., upper.T].sum(axis=-1)
+        self.regulation_win2 = scores[..., upper].sum(axis=-1)
+        ot_share1 = np.where(s1 > s2, 1.0, np.where(s1 < s2, 0.0, 0.5))
+        self.ot_win1 = self.tie * ot_share1
+        self.ot_win2 = self.tie - self.ot_win1
+        self.win1 = self.regulation_win1 + self.ot_win1
+
+        goals = np.arange(MAX_SCORE + 1)
+        self.expected_goals1 = scores.sum(axis=3) @ goals
+        self.expected_goals2 = scores.sum(axis=2) @ goals
+        self._matrix = None
+
+    def pair(self, team1, team2, score_lines=True):
+        i, j = self.index[team1], self.index[team2]
+        result = {
+            "team1": team1,
+            "team2": team2,
+            "win_probability1": round(float(self.win1[i, j]), 6),
+            "win_probability2": round(float(1 - self.win1[i, j]), 6),
+            "regulation_win1": round(float(self.regulation_win1[i, j]), 6),
+            "regulation_win2": round(float(self.regulation_win2[i, j]), 6),
+            "ot_win1": round(float(self.ot_win1[i, j]), 6),
+            "ot_win2": round(float(self.ot_win2[i, j]), 6),
+            "tie_probability": round(float(self.tie[i, j]), 6),
+            "expected_goals1": round(float(self.expected_goals1[i, j]), 4),
+            "expected_goals2": round(float(self.expected_goals2[i, j]), 4)
+        }
+        if score_lines:
+            # scores[a][b] = P(team1 scores a, team2 scores b)
+            result["scores"] = np.round(self.scores[i, j], 6).tolist()
+        return result
+
+    def matrix(self):
+        """{"teams": [...], "win_probability": rows = team1, columns = team2}; computed once."""
+        if self._matrix is None:
+            win = np.round(self.win1, 4)
+            np.fill_diagonal(win, np.nan)
+            self._matrix = {
+                "teams": self.teams,
+                "win_probability": [[None if v != v else float(v) for v in row] for row in win.tolist()]
+            }
+        return self._matrix
+
+class HeadToHeadTable:
+    """HeadToHead for the current strengths, rebuilt only when their version changes."""
+
+    def __init__(self):
+        self._version = None
+        self._table = None
+
+    def get(self, strengths, version):
+        if version != self._version:
+            self._table = HeadToHead(list(strengths), strengths)
+            self._version = version
+        return self._table
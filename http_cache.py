@@ -0,0 +1,223 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app, jsonify, request, send_file
+
+import profiling
+from serialization import shape
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz variants are built and served
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Text assets worth compressing; PNG logos are already compressed
+PRECOMPRESS_FILES = [
+    "index.html", "teams.html", "roster.html",
+    "static/script.js", "static/stylesheet.css",
+    "static/merged_players.json", "static/normalized_ratings.json", "static/full_ratings.json",
+]
+
+# Cache-Control by file extension. Pages and pipeline-written data are
+# always revalidated (cheap with ETags); code and logos may be reused for a while.
+CACHE_POLICIES = {
+    ".html": "public, no-cache",
+    ".json": "public, no-cache",
+    ".js": "public, max-age=3600",
+    ".css": "public, max-age=3600",
+    ".png": "public, max-age=86400",
+}
+DEFAULT_POLICY = "public, no-cache"
+API_POLICY = "public, no-cache"
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+MAX_CACHED_BODIES = 64
+COMPRESS_MIN_BYTES = 1024  # below this the headers outweigh the saving
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # per-request compression; the build step uses the slow maximum
+
+# --- Build step ---
+
+def _stale(source, target):
+    return not os.path.exists(target) or os.stat(target).st_mtime_ns < os.stat(source).st_mtime_ns
+
+def precompress(paths=PRECOMPRESS_FILES, root=ROOT):
+    """Write .gz (and .br when brotli is installed) next to each file that changed."""
+    written = []
+    for path in paths:
+        source = os.path.join(root, path)
+        if not os.path.exists(source):
+            continue
+        with open(source, "rb") as f:
+            raw = f.read()
+        variants = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", lambda data: brotli.compress(data, quality=11)))
+        for suffix, compress in variants:
+            if _stale(source, source + suffix):
+                with open(source + suffix, "wb") as f:
+                    f.write(compress(raw))
+                written.append(path + suffix)
+    return written
+
+# --- Static files ---
+
+_digests = {}
+_lock = threading.Lock()
+
+def file_etag(path):
+    """Strong ETag from the file's content hash, recomputed only when mtime/size change."""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if key not in _digests:
+            with open(path, "rb") as f:
+                _digests[key] = hashlib.sha256(f.read()).hexdigest()[:32]
+        return _digests[key]
+
+def _not_modified(etag, cache_control):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+def send_cached(path, cache_control=None):
+    """send_file with a strong ETag, a Cache-Control policy, 304s and precompressed variants.
+
+    A fresh .br or .gz next to `path` is served when the client accepts
+    that encoding; each encoding gets its own ETag as required for strong
+    validators.
+    """
+    path = os.path.join(ROOT, path)
+    if cache_control is None:
+        cache_control = CACHE_POLICIES.get(os.path.splitext(path)[1], DEFAULT_POLICY)
+
+    base_etag = file_etag(path)
+    served, encoding, etag = path, None, base_etag
+    for name, suffix in ENCODINGS:
+        if name in request.accept_encodings and not _stale(path, path + suffix):
+            served, encoding, etag = path + suffix, name, f"{base_etag}-{suffix[1:]}"
+            break
+
+    if etag in request.if_none_match:
+        response = _not_modified(etag, cache_control)
+    else:
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        response = send_file(served, mimetype=mimetype, conditional=False, etag=False, max_age=None)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = cache_control
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    if any(os.path.exists(path + suffix) for _, suffix in ENCODINGS):
+        response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+# --- API responses ---
+
+def negotiated_encoding():
+    """Best content coding we can produce that the client accepts, or None."""
+    for name, _ in ENCODINGS:
+        if name == "br" and brotli is None:
+            continue
+        if name in request.accept_encodings:
+            return name
+    return None
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+_bodies = OrderedDict()  # ETag -> (body, content encoding or None)
+
+def _cached_body(key):
+    with _lock:
+        entry = _bodies.get(key)
+        if entry is not None:
+            _bodies.move_to_end(key)
+        return entry
+
+def _cache_body(key, entry):
+    with _lock:
+        _bodies[key] = entry
+        while len(_bodies) > MAX_CACHED_BODIES:
+            _bodies.popitem(last=False)
+
+def clear():
+    """Forget every encoded body, e.g. to time the full build-and-encode path."""
+    with _lock:
+        _bodies.clear()
+
+def snapshot_json(fingerprint, build, deterministic=True):
+    """JSON response validated by the data snapshot it was built from.
+
+    The ETag covers the snapshot fingerprint and the full request path, so
+    a repeat request answers 304 without calling `build`, and the encoded
+    (and compressed) body is reused for other clients. Non-deterministic
+    responses (unseeded simulations) and profiled requests are built
+    every time and marked no-store instead.
+    The request's fields/layout shaping is applied to what `build` returns.
+    """
+    if not deterministic or profiling.active():
+        response = jsonify(shape(build()))
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    base_etag = hashlib.sha256(f"{fingerprint}|{request.full_path}".encode()).hexdigest()[:32]
+    encoding = negotiated_encoding()
+    etag = f"{base_etag}-{dict(ENCODINGS)[encoding][1:]}" if encoding else base_etag
+    if etag in request.if_none_match:
+        response = _not_modified(etag, API_POLICY)
+        response.vary.add("Accept-Encoding")
+        return response
+
+    cached = _cached_body(etag)
+    if cached is None:
+        cached = _cached_body(base_etag)
+        if cached is None:
+            response = jsonify(shape(build()))
+            if response.status_code != 200:
+                return response
+            cached = (response.get_data(), None)
+            _cache_body(base_etag, cached)
+        if encoding:
+            # Small bodies go out uncompressed under the variant ETag all the same
+            body = cached[0]
+            cached = (compress(body, encoding), encoding) if len(body) >= COMPRESS_MIN_BYTES else (body, None)
+            _cache_body(etag, cached)
+
+    body, content_encoding = cached
+    response = current_app.response_class(body, mimetype="application/json")
+    if content_encoding:
+        response.headers["Content-Encoding"] = content_encoding
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = API_POLICY
+    response.vary.add("Accept-Encoding")
+    return response
+
+def compress_response(response):
+    """after_request hook compressing JSON bodies that were not already encoded."""
+    if (response.status_code != 200 or response.mimetype != "application/json"
+            or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    encoding = negotiated_encoding()
+    if encoding is None or len(body) < COMPRESS_MIN_BYTES:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+def install(app):
+    app.after_request(compress_response)
+
+if __name__ == "__main__":
+    written = precompress()
+    print(f"✅ Precompressed {len(written)} file(s)" + ("" if brotli else " (brotli not installed, gzip only)"))
@@ -0,0 +1,25 @@
+ATL = ['TOR', 'TBL', 'FLA', 'OTT', 'MTL', 'DET', 'BUF', 'BOS']
+MTR = ['WSH', 'CAR', 'NJD', 'CBJ', 'NYR', 'NYI', 'PIT', 'PHI']
+CEN = ['WPG', 'DAL', 'COL', 'MIN', 'STL', 'UTA', 'NSH', 'CHI']
+PCF = ['VGK', 'LAK', 'EDM', 'CGY', 'VAN', 'ANA', 'SEA', 'SJS']
+
+DIVISIONS = [ATL, MTR, CEN, PCF]
+EAST = ATL + MTR
+WEST = CEN + PCF
+CONFERENCES = [(ATL, MTR), (CEN, PCF)]
+
+def division_of(team):
+    for div in DIVISIONS:
+        if team in div:
+            return div
+    return []
+
+def same_division(t1, t2):
+    return t2 in division_of(t1)
+
+def same_conference(t1, t2):
+    return (t1 in EAST and t2 in EAST) or (t1 in WEST and t2 in WEST)
+
+def has_league_layout(teams):
+    """True when the team set is exactly the 32-team division layout above."""
+    return sorted(teams) == sorted(EAST + WEST)
@@ -0,0 +1,258 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+
+from serialization import JSONProvider
+
+ENABLED = os.environ.get("METRICS_ENABLED", "0") == "1"
+PREFIX = "sim_"
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Counters live in each process. With several gunicorn workers a scrape
+# reaches one of them at random, so set METRICS_DIR to a directory all
+# workers share: each one writes its samples there and /api/metrics
+# reports the sum over every worker that has run since the server started.
+METRICS_DIR = os.environ.get("METRICS_DIR")
+FLUSH_SECONDS = 1.0  # how stale another worker's samples may be in a scrape
+
+_lock = threading.Lock()
+_flushed = 0.0
+_process_file = None
+_inherited = {}  # collector counts the master reached while preloading, already in its own file
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, dict(key), value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.values = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        slot = bisect_left(self.buckets, value)
+        with _lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[slot] += 1
+            counts[-1] += value
+
+    def samples(self):
+        for key, counts in self.values.items():
+            labels = dict(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": str(bound)}, cumulative
+            yield f"{self.name}_sum", labels, counts[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+REQUEST_SECONDS = Histogram(PREFIX + "http_request_duration_seconds", "Request latency by route.")
+PHASE_SECONDS = Histogram(PREFIX + "phase_duration_seconds", "Time spent in data loading, simulation and serialization.")
+GAMES_SIMULATED = Counter(PREFIX + "games_simulated_total", "Games simulated, by game model.")
+_METRICS = [REQUEST_SECONDS, PHASE_SECONDS, GAMES_SIMULATED]
+_collectors = []
+
+# --- Recording (all no-ops when metrics are disabled) ---
+
+def games_simulated(count, model):
+    if ENABLED:
+        GAMES_SIMULATED.inc(count, model=model)
+
+def observe_phase(phase, seconds, **labels):
+    if ENABLED:
+        PHASE_SECONDS.observe(seconds, phase=phase, **labels)
+
+def timed(phase, fn, **labels):
+    """Wrap `fn` so each call is recorded as one `phase` observation."""
+    if not ENABLED:
+        return fn
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            PHASE_SECONDS.observe(time.perf_counter() - start, phase=phase, **labels)
+    return wrapper
+
+def collector(fn):
+    """Register fn() -> [(name, kind, help, [(labels, value), ...])], read at scrape time only."""
+    _collectors.append(fn)
+    return fn
+
+# --- Flask integration ---
+
+class TimedJSONProvider(JSONProvider):
+    """Records how long jsonify spends encoding each response."""
+
+    def encode(self, obj, pretty=False):
+        start = time.perf_counter()
+        try:
+            return super().encode(obj, pretty)
+        finally:
+            PHASE_SECONDS.observe(time.perf_counter() - start, phase="serialize")
+
+def install(app):
+    """Per-route latency and serialization timing; nothing is hooked when disabled."""
+    if not ENABLED:
+        return
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_latency(response):
+        start = g.pop("metrics_start", None)
+        if start is not None and request.url_rule is not None:
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                route=request.url_rule.rule, method=request.method, status=str(response.status_code)
+            )
+        if METRICS_DIR and time.monotonic() - _flushed >= FLUSH_SECONDS:
+            flush()
+        return response
+
+# --- Sharing between worker processes ---
+
+def _after_fork():
+    global _lock, _flushed, _process_file
+    _lock = threading.Lock()
+    _flushed, _process_file = 0.0, None
+    for metric in _METRICS:
+        metric.values = {}  # the master's samples are not this worker's
+
+os.register_at_fork(after_in_child=_after_fork)
+
+def _families(final=False):
+    """[(name, kind, help, [(sample name, labels, value), ...])] for this process."""
+    with _lock:
+        families = [(metric.name, metric.kind, metric.help, list(metric.samples())) for metric in _METRICS]
+    for fn in _collectors:
+        for name, kind, help_text, samples in fn():
+            families.append((PREFIX + name, kind, help_text, [
+                (PREFIX + name, labels, value - _inherited.get((PREFIX + name, tuple(labels.items())), 0))
+                for labels, value in samples
+            ]))
+    if final:
+        # An exited worker's counts still belong in the totals; its gauges do not
+        families = [family for family in families if family[1] != "gauge"]
+    return families
+
+def flush(final=False):
+    """Write this process's samples to METRICS_DIR; `final` when the worker exits."""
+    global _flushed, _process_file
+    if not (ENABLED and METRICS_DIR):
+        return
+    if _process_file is None:
+        # pid plus start time: a restarted worker can reuse a pid, not its predecessor's file
+        _process_file = os.path.join(METRICS_DIR, f"{os.getpid()}-{time.time_ns()}.json")
+    _flushed = time.monotonic()
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    # Write-then-rename so a scrape never reads a partial file
+    fd, tmp = tempfile.mkstemp(dir=METRICS_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(_families(final), f)
+        os.replace(tmp, _process_file)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def flush_preloaded():
+    """Flush the master's preload samples once, before the workers fork.
+
+    Workers inherit the collectors' underlying counts (schedules built,
+    strength recomputes) and report only what they add on top of them.
+    """
+    global _inherited
+    flush()
+    if ENABLED and METRICS_DIR:
+        _inherited = {
+            (name, tuple(labels.items())): value
+            for name, kind, _, samples in _families() if kind == "counter"
+            for name, labels, value in samples
+        }
+
+def reset_shared():
+    """Drop samples left by a previous server run; call once in the master before loading the app."""
+    if not METRICS_DIR:
+        return
+    try:
+        names = os.listdir(METRICS_DIR)
+    except OSError:
+        return
+    for name in names:
+        try:
+            os.remove(os.path.join(METRICS_DIR, name))
+        except OSError:
+            pass
+
+def _merged():
+    """Every worker's families with same-named, same-labelled samples summed."""
+    flush()
+    families, totals = {}, {}
+    for name in sorted(os.listdir(METRICS_DIR)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name), "r") as f:
+                worker = json.load(f)
+        except (OSError, ValueError):
+            continue  # removed by reset_shared, or unreadable
+        for family, kind, help_text, samples in worker:
+            families.setdefault(family, (kind, help_text))
+            family_totals = totals.setdefault(family, {})
+            for sample, labels, value in samples:
+                # Cumulative histogram buckets add up like any other count
+                key = (sample, tuple(labels.items()))
+                family_totals[key] = family_totals.get(key, 0) + value
+    return [
+        (family, kind, help_text, [(sample, dict(labels), value) for (sample, labels), value in totals[family].items()])
+        for family, (kind, help_text) in families.items()
+    ]
+
+# --- Exposition ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _line(name, labels, value):
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{label_text}}} {value}"
+    return f"{name} {value}"
+
+def render():
+    """All metrics in the Prometheus text exposition format, summed over workers with METRICS_DIR."""
+    lines = []
+    for family, kind, help_text, samples in (_merged() if METRICS_DIR else _families()):
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        lines.extend(_line(name, labels, value) for name, labels, value in samples)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,152 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+VALIDATORS_FILE = ".fetch_validators.json"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Blocking rate limiter shared by all fetch threads."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class PooledFetcher:
+    """Fetches many JSON URLs concurrently over one pooled session.
+
+    Requests are rate limited, retried with exponential backoff, and sent
+    with If-None-Match / If-Modified-Since when a previous response left
+    validators, so unchanged resources come back as a cheap 304.
+    """
+
+    def __init__(self, max_workers=8, rate=5, retries=3, backoff=0.5, timeout=15,
+                 validators_file=VALIDATORS_FILE):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.validators_file = validators_file
+        self.limiter = TokenBucket(rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.validators = self._load_validators()
+        self.lock = threading.Lock()
+
+    def _load_validators(self):
+        if self.validators_file and os.path.exists(self.validators_file):
+            with open(self.validators_file, "r") as f:
+                return json.load(f)
+        return {}
+
+    def save_validators(self):
+        if self.validators_file:
+            with open(self.validators_file, "w") as f:
+                json.dump(self.validators, f, indent=2)
+
+    def _request(self, url, conditional):
+        headers = {}
+        cached = self.validators.get(url, {}) if conditional else {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                res = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                res = None
+
+            if res is not None and res.status_code not in RETRY_STATUSES:
+                return res
+            if res is not None and attempt == self.retries:
+                res.raise_for_status()
+
+            delay = self.backoff * (2 ** attempt) * (1 + random.random())
+            retry_after = res.headers.get("Retry-After") if res is not None else None
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            time.sleep(delay)
+
+    def fetch(self, url, conditional=True):
+        """Returns ("updated", data), ("unchanged", None) or ("failed", error)."""
+        try:
+            res = self._request(url, conditional)
+            if res.status_code == 304:
+                return "unchanged", None
+            res.raise_for_status()
+            data = res.json()
+        except (requests.RequestException, ValueError) as e:
+            return "failed", e
+
+        with self.lock:
+            self.validators[url] = {
+                "etag": res.headers.get("ETag"),
+                "last_modified": res.headers.get("Last-Modified")
+            }
+        return "updated", data
+
+    def fetch_all(self, urls, conditional_keys=()):
+        """Fetch {key: url} concurrently; only keys in `conditional_keys` send validators."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                key: pool.submit(self.fetch, url, key in conditional_keys)
+                for key, url in urls.items()
+            }
+            return {key: future.result() for key, future in futures.items()}
+
+def fetch_into(output_file, urls, transform=None, **fetcher_options):
+    """Refresh `output_file` ({key: data}) from {key: url}, keeping entries that came back unchanged."""
+    existing = {}
+    if os.path.exists(output_file):
+        with open(output_file, "r") as f:
+            existing = json.load(f)
+
+    fetcher = PooledFetcher(**fetcher_options)
+    results = fetcher.fetch_all(urls, conditional_keys=set(existing))
+
+    merged = {}
+    for key in urls:
+        status, payload = results[key]
+        if status == "updated":
+            merged[key] = transform(payload) if transform else payload
+            print(f"✅ {key} updated")
+        elif status == "unchanged":
+            merged[key] = existing[key]
+            print(f"⏭️ {key} unchanged")
+        else:
+            print(f"❌ Failed to fetch data for {key}: {payload}")
+            if key in existing:
+                merged[key] = existing[key]
+
+    with open(output_file, "w") as f:
+        json.dump(merged, f, indent=2)
+    fetcher.save_validators()
+    return results
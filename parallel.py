@@ -0,0 +1,308 @@
+import multiprocessing
+import os
+import sys
+import threading
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import season_engine
+from samplers import RosterSampler
+from season_engine import SeasonAggregate, PlayerSeasonStats, chunk_seeds, expand_schedule
+
+WORKERS = int(os.environ.get("SIMULATION_WORKERS", os.cpu_count() or 1))
+TASKS_PER_WORKER = 4  # more, smaller tasks keep progress moving and balance uneven workers
+MAX_FINISHED_JOBS = 50
+ATTACH_CACHE_SIZE = 4
+
+# --- Shared memory ---
+
+class SharedArrays:
+    """Packs named arrays into one shared-memory block that workers attach to by name.
+
+    The block also carries a one-byte cancel flag, so a running job can be
+    stopped between chunks without any extra IPC.
+    """
+
+    def __init__(self, arrays):
+        arrays = {"cancel": np.zeros(1, dtype=np.uint8), **arrays}
+        layout, offset = {}, 0
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            layout[key] = (offset, array.shape, array.dtype.str)
+            offset += -(-array.nbytes // 8) * 8
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 8))
+        self.spec = (self.shm.name, layout)
+        self.arrays = _views(self.shm, layout)
+        for key, array in arrays.items():
+            self.arrays[key][...] = array
+
+    def cancel(self):
+        self.arrays["cancel"][0] = 1
+
+    def close(self):
+        self.arrays = None
+        self.shm.close()
+        self.shm.unlink()
+
+def _views(shm, layout):
+    return {
+        key: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        for key, (offset, shape, dtype) in layout.items()
+    }
+
+# Worker side: one attachment (plus anything derived from it) per job
+_attached = {}
+
+def _attach(spec):
+    name, layout = spec
+    if name not in _attached:
+        while len(_attached) >= ATTACH_CACHE_SIZE:
+            # Oldest first; dict.popitem() would drop the newest attachment
+            old_shm, _, _ = _attached.pop(next(iter(_attached)))
+            old_shm.close()
+        # Spawned workers share the parent's resource tracker, so the
+        # parent's unlink() in SharedArrays.close() covers this attachment too
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = (shm, _views(shm, layout), {})
+    _, arrays, derived = _attached[name]
+    return arrays, derived
+
+# --- Worker tasks ---
+
+def _season_task(spec, teams, max_points, chunks):
+    arrays, _ = _attach(spec)
+    aggregate = SeasonAggregate(len(teams), max_points)
+    for size, seed in chunks:
+        if arrays["cancel"][0]:
+            break
+        rng = np.random.default_rng(seed)
+        season_engine.add_season_chunk(aggregate, teams, arrays["strengths"], arrays["home"], arrays["away"], size, rng)
+    return aggregate
+
+def _player_task(spec, chunks):
+    arrays, derived = _attach(spec)
+    offsets = arrays["offsets"]
+    if "samplers" not in derived:
+        ratings = arrays["ratings"]
+        derived["samplers"] = [
+            RosterSampler.from_ratings(ratings[offsets[t]:offsets[t + 1]]) for t in range(len(offsets) - 1)
+        ]
+
+    seasons = 0
+    goals = np.zeros(len(arrays["ratings"]), dtype=np.int64)
+    assists = np.zeros_like(goals)
+    for size, seed in chunks:
+        if arrays["cancel"][0]:
+            break
+        chunk_goals, chunk_assists = season_engine.player_chunk_counts(
+            arrays["strengths"], arrays["home"], arrays["away"], derived["samplers"],
+            offsets, len(goals), size, np.random.default_rng(seed)
+        )
+        goals += chunk_goals
+        assists += chunk_assists
+        seasons += size
+    return seasons, goals, assists
+
+# --- Pool and jobs ---
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a threaded Flask process is not safe
+            _executor = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+def _reset_after_fork():
+    # A forked server worker must not reuse the parent's pool or job registry
+    global _executor, _executor_lock, _jobs_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+    _jobs.clear()
+    _jobs_lock = threading.Lock()
+
+def gevent_patched():
+    """True in a gevent worker, where threads are greenlets sharing the hub's OS thread."""
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("threading")
+
+def offload(fn, *args):
+    """Call fn(*args), on gevent's native thread pool when running under gevent.
+
+    The request greenlet waits for the result while the hub keeps serving
+    other requests, so a long simulation does not stall cheap routes in
+    the same worker. Everywhere else this is a plain call.
+    """
+    if gevent_patched():
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+def task_groups(seeds):
+    """Consecutive runs of chunks, so each worker task carries several chunks' worth of work."""
+    per_task = max(1, -(-len(seeds) // (WORKERS * TASKS_PER_WORKER)))
+    return [seeds[i:i + per_task] for i in range(0, len(seeds), per_task)]
+
+class JobFailed(RuntimeError):
+    pass
+
+class SimulationJob:
+    """A batch of seasons running on the process pool.
+
+    Chunks are seeded exactly like the serial engine, so a job's result is
+    identical to simulate_seasons / simulate_player_seasons with the same
+    seed and chunk size. Partial results are merged as tasks finish.
+    """
+
+    def __init__(self, kind, teams, n_seasons, result, shared, merge):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.teams = list(teams)
+        self.n_seasons = n_seasons
+        self.result = result
+        self.status = "running"
+        self.error = None
+        self.completed = 0
+        self._shared = shared
+        self._merge = merge
+        self._futures = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._callbacks = []
+
+    def _start(self, fn, groups, *args):
+        self._pending = len(groups)
+        pool = executor()
+        self._futures = [pool.submit(fn, self._shared.spec, *args, group) for group in groups]
+        for future in self._futures:
+            future.add_done_callback(self._task_done)
+
+    def _task_done(self, future):
+        with self._lock:
+            try:
+                partial = future.result()
+                if self.status == "running":
+                    self.completed += self._merge(self.result, partial)
+            except CancelledError:
+                pass
+            except Exception as e:
+                if self.status == "running":
+                    self.status, self.error = "failed", str(e)
+                    self._shared.cancel()
+            self._pending -= 1
+            if self._pending != 0:
+                return
+            if self.status == "running":
+                self.status = "finished"
+            self._shared.close()
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+    def add_done_callback(self, fn):
+        """Call fn(job) once every task has ended, however the job ended; now if it already has."""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    @property
+    def progress(self):
+        return self.completed / self.n_seasons
+
+    def cancel(self):
+        with self._lock:
+            if self.status != "running":
+                return False
+            self.status = "cancelled"
+            self._shared.cancel()
+        for future in self._futures:
+            future.cancel()
+        return True
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.result if self.status == "finished" else None
+
+    def result_or_raise(self):
+        """Wait for the job and return its result, raising JobFailed if it did not finish."""
+        result = self.wait()
+        if result is None:
+            raise JobFailed(f"Simulation job {self.id} {self.status}: {self.error or 'no result'}")
+        return result
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "seasons": self.n_seasons,
+            "completed": self.completed,
+            "progress": round(self.progress, 4),
+            "error": self.error
+        }
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+def _register(job):
+    with _jobs_lock:
+        finished = [j for j in _jobs.values() if j.status != "running"]
+        for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS + 1)]:
+            del _jobs[old.id]
+        _jobs[job.id] = job
+    return job
+
+def get_job(job_id):
+    return _jobs.get(job_id)
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _merge_seasons(aggregate, partial):
+    aggregate.merge(partial)
+    return partial.seasons
+
+def _merge_players(stats, partial):
+    seasons, goals, assists = partial
+    stats.goals += goals
+    stats.assists += assists
+    stats.seasons += seasons
+    return seasons
+
+def submit_seasons(teams, strengths, schedule, n_seasons, seed=None, chunk_size=season_engine.CHUNK_SIZE):
+    """Start a simulate_seasons run on the pool and return its job."""
+    home, away = expand_schedule(schedule, teams)
+    max_points = season_engine.max_season_points(home, away, len(teams))
+    shared = SharedArrays({
+        "strengths": np.array([strengths[t] for t in teams], dtype=float),
+        "home": home,
+        "away": away
+    })
+    job = SimulationJob("seasons", teams, n_seasons, SeasonAggregate(len(teams), max_points), shared, _merge_seasons)
+    job._start(_season_task, task_groups(chunk_seeds(seed, n_seasons, chunk_size)), list(teams), max_points)
+    return _register(job)
+
+def submit_player_seasons(teams, strengths, schedule, samplers, n_seasons, seed=None,
+                          chunk_size=season_engine.PLAYER_CHUNK_SIZE):
+    """Start a simulate_player_seasons run on the pool and return its job."""
+    home, away = expand_schedule(schedule, teams)
+    stats = PlayerSeasonStats(teams, samplers)
+    shared = SharedArrays({
+        "strengths": np.array([strengths[t] for t in teams], dtype=float),
+        "home": home,
+        "away": away,
+        "ratings": np.concatenate([samplers[t].weights for t in teams]),
+        "offsets": np.append(stats.offsets, len(stats.ids))
+    })
+    job = SimulationJob("players", teams, n_seasons, stats, shared, _merge_players)
+    job._start(_player_task, task_groups(chunk_seeds(seed, n_seasons, chunk_size)))
+    return _register(job)
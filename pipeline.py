@@ -0,0 +1,175 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+import http_cache
+import snapshot_store
+from create_team_rosters import build_roster
+from extract_player_ratings import extract_team
+
+STATE_FILE = ".pipeline_state.json"
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+class Stage:
+    """One pipeline step: a script (or per-team function) with declared inputs and outputs.
+
+    Stages with `team_fn` map each team's section of their single input to
+    the same team's section of their single output, so only teams whose
+    input changed are recomputed.
+    """
+
+    def __init__(self, name, script, inputs, outputs, cwd=".", team_fn=None):
+        self.name = name
+        self.script = script
+        self.inputs = inputs
+        self.outputs = outputs
+        self.cwd = cwd
+        self.team_fn = team_fn
+
+STAGES = [
+    Stage("extract", "extract_player_ratings.py",
+          ["team_stats.json"], ["player_ratings.json"], team_fn=extract_team),
+    Stage("create_ratings", "create_ratings.py",
+          ["player_ratings.json"], ["normalized_player_ratings.json"]),
+    Stage("team_rosters", "create_team_rosters.py",
+          ["normalized_player_ratings.json"], ["team_rosters.json"], team_fn=build_roster),
+    Stage("team_ratings", "calculate_team_ratings.py",
+          ["team_rosters.json"], ["team_ratings.json"]),
+    Stage("simplify_rosters", "simplify_rosters.py",
+          ["roster_data.json"], ["simplified_players.json"]),
+    Stage("merge_ids", "merge_ids.py",
+          ["simplified_players.json", "team_rosters.json"], ["static/merged_players.json"]),
+    Stage("normalized_ratings", "static/team_ratings.py",
+          ["static/merged_players.json"], ["static/normalized_ratings.json"], cwd="static"),
+    Stage("snapshots", "snapshot_store.py",
+          [source for source, _ in snapshot_store.TABLES.values()],
+          [os.path.join(snapshot_store.SNAPSHOT_DIR, name, "meta.json") for name in snapshot_store.TABLES]),
+    Stage("precompress", "http_cache.py",
+          http_cache.PRECOMPRESS_FILES, [path + ".gz" for path in http_cache.PRECOMPRESS_FILES]),
+]
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(os.path.join(ROOT, path), "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def section_hash(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+def load_state():
+    path = os.path.join(ROOT, STATE_FILE)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return {}
+
+def save_state(state):
+    with open(os.path.join(ROOT, STATE_FILE), "w") as f:
+        json.dump(state, f, indent=2)
+
+def stage_fingerprint(stage):
+    # The script itself is an input: editing it makes the stage stale
+    return {path: file_hash(path) for path in stage.inputs + [stage.script]}
+
+def is_stale(stage, recorded, inputs):
+    if not recorded or recorded.get("inputs") != inputs:
+        return True
+    for path in stage.outputs:
+        if not os.path.exists(os.path.join(ROOT, path)):
+            return True
+        if recorded.get("outputs", {}).get(path) != file_hash(path):
+            return True
+    return False
+
+def run_script(stage):
+    script = os.path.relpath(os.path.join(ROOT, stage.script), os.path.join(ROOT, stage.cwd))
+    subprocess.run([sys.executable, script], cwd=os.path.join(ROOT, stage.cwd), check=True)
+
+def run_per_team(stage, recorded):
+    with open(os.path.join(ROOT, stage.inputs[0]), "r", encoding="utf-8") as f:
+        source = json.load(f)
+
+    output_path = os.path.join(ROOT, stage.outputs[0])
+    previous = {}
+    if os.path.exists(output_path):
+        with open(output_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    # Team hashes are only trusted if the output and script are untouched
+    old_hashes = {}
+    if recorded and recorded.get("outputs", {}).get(stage.outputs[0]) == file_hash(stage.outputs[0]) \
+            and recorded.get("inputs", {}).get(stage.script) == file_hash(stage.script):
+        old_hashes = recorded.get("teams", {})
+
+    result, team_hashes, rebuilt = {}, {}, []
+    for team, section in source.items():
+        team_hashes[team] = section_hash(section)
+        if old_hashes.get(team) == team_hashes[team] and team in previous:
+            result[team] = previous[team]
+        else:
+            result[team] = stage.team_fn(section)
+            rebuilt.append(team)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    print(f"   rebuilt {len(rebuilt)}/{len(source)} teams" + (f": {', '.join(rebuilt)}" if rebuilt else ""))
+    return team_hashes
+
+def run_pipeline(only=None, force=False, dry_run=False):
+    state = load_state()
+    ran = []
+
+    for stage in STAGES:
+        if only and stage.name not in only:
+            continue
+
+        inputs = stage_fingerprint(stage)
+        recorded = state.get(stage.name)
+        if not force and not is_stale(stage, recorded, inputs):
+            print(f"⏭️ {stage.name} is up to date")
+            continue
+
+        print(f"▶️ {stage.name}" + (" (dry run)" if dry_run else ""))
+        if dry_run:
+            ran.append(stage.name)
+            continue
+
+        entry = {}
+        if stage.team_fn and not force:
+            entry["teams"] = run_per_team(stage, recorded)
+        else:
+            run_script(stage)
+            if stage.team_fn:
+                with open(os.path.join(ROOT, stage.inputs[0]), "r", encoding="utf-8") as f:
+                    entry["teams"] = {team: section_hash(s) for team, s in json.load(f).items()}
+
+        entry["inputs"] = inputs
+        entry["outputs"] = {path: file_hash(path) for path in stage.outputs}
+        state[stage.name] = entry
+        save_state(state)
+        ran.append(stage.name)
+
+    print(f"✅ Pipeline finished, {len(ran)} stage(s) run")
+    return ran
+
+def main():
+    parser = argparse.ArgumentParser(description="Rerun only the stale stages of the rating pipeline.")
+    parser.add_argument("stages", nargs="*", help="limit the run to these stages")
+    parser.add_argument("--force", action="store_true", help="rerun every selected stage")
+    parser.add_argument("--dry-run", action="store_true", help="only report which stages are stale")
+    args = parser.parse_args()
+
+    unknown = set(args.stages) - {stage.name for stage in STAGES}
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    run_pipeline(only=set(args.stages), force=args.force, dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    main()
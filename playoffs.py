@@ -0,0 +1,187 @@
+import numpy as np
+
+from head_to_head import HeadToHead
+from league import CONFERENCES, has_league_layout
+from season_engine import (
+    PLAYOFF_SPOTS_PER_DIVISION, PLAYOFF_TEAMS, WILD_CARDS_PER_CONFERENCE,
+    chunk_generators, season_ranks, simulate_season_block, standings_keys
+)
+
+# Home games from the higher seed's point of view (2-2-1-1-1)
+HOME_PATTERN = (True, True, False, False, True, False, True)
+ROUNDS = ["win_round_1", "win_round_2", "win_conference", "win_cup"]
+MAX_PLAYOFF_SEASONS = 2000
+PLAYOFF_CHUNK_SIZE = 250
+
+def series_win_probability(game_probs):
+    """P(first team wins a best-of-len(game_probs) series), by DP over (wins, losses).
+
+    game_probs[g] is the first team's chance of winning game g if it is
+    played; trailing dimensions broadcast, so a whole matrix of matchups is
+    solved at once.
+    """
+    game_probs = np.asarray(game_probs, dtype=float)
+    need = (len(game_probs) + 1) // 2
+    states = {(0, 0): np.ones(game_probs.shape[1:])}
+    won = np.zeros(game_probs.shape[1:])
+
+    for p in game_probs:
+        next_states = {}
+        for (wins, losses), prob in states.items():
+            if wins + 1 == need:
+                won = won + prob * p
+            else:
+                next_states[(wins + 1, losses)] = next_states.get((wins + 1, losses), 0) + prob * p
+            if losses + 1 < need:
+                next_states[(wins, losses + 1)] = next_states.get((wins, losses + 1), 0) + prob * (1 - p)
+        states = next_states
+    return won
+
+def league_bracket(teams, ranks):
+    """Division bracket as nested (a, b) tuples of team indices.
+
+    Per conference, the better division winner meets the second wild card,
+    the other winner meets the first, and 2 plays 3 in each division.
+    """
+    index = {team: i for i, team in enumerate(teams)}
+    halves = []
+    for divisions in CONFERENCES:
+        qualified, sides = set(), []
+        for div in divisions:
+            top = sorted((index[t] for t in div), key=lambda i: ranks[i])[:PLAYOFF_SPOTS_PER_DIVISION]
+            qualified.update(top)
+            sides.append(top)
+
+        rest = sorted((index[t] for div in divisions for t in div if index[t] not in qualified),
+                      key=lambda i: ranks[i])
+        first_wc, second_wc = rest[:WILD_CARDS_PER_CONFERENCE]
+        if ranks[sides[1][0]] < ranks[sides[0][0]]:
+            first_wc, second_wc = second_wc, first_wc
+
+        halves.append((
+            ((sides[0][0], second_wc), (sides[0][1], sides[0][2])),
+            ((sides[1][0], first_wc), (sides[1][1], sides[1][2]))
+        ))
+    return tuple(halves)
+
+def seeded_bracket(ranks, n_teams=PLAYOFF_TEAMS):
+    """Standard 1-16, 8-9, ... bracket over the top `n_teams` (rounded down to a power of two)."""
+    size = 1 << (max(n_teams, 2).bit_length() - 1)
+    seeds = np.argsort(ranks, kind="stable")[:size]
+
+    # 1 and 2 can only meet in the final: [1, 16, 8, 9, 4, 13, 5, 12, 2, 15, ...]
+    order = [1]
+    while len(order) < size:
+        order = [s for seed in order for s in (seed, 2 * len(order) + 1 - seed)]
+
+    nodes = [int(seeds[s - 1]) for s in order]
+    while len(nodes) > 1:
+        nodes = [(nodes[i], nodes[i + 1]) for i in range(0, len(nodes), 2)]
+    return nodes[0]
+
+def bracket_teams(node):
+    if not isinstance(node, tuple):
+        return [node]
+    return bracket_teams(node[0]) + bracket_teams(node[1])
+
+class PlayoffModel:
+    """Exact Cup odds for a given regular-season finish.
+
+    Per-game win probabilities come from the analytic HeadToHead model with
+    the home side as team1; the better regular-season team gets home ice.
+    Series odds for every pair are solved once, then each bracket is
+    propagated round by round as probability vectors over teams.
+    """
+
+    def __init__(self, teams, head_to_head):
+        self.teams = list(teams)
+        idx = [head_to_head.index[t] for t in self.teams]
+        win = head_to_head.win1[np.ix_(idx, idx)]
+        home, away = win, 1 - win.T
+        game_probs = np.array([home if at_home else away for at_home in HOME_PATTERN])
+        # series_home[i, j]: i beats j with i holding home ice
+        self.series_home = series_win_probability(game_probs)
+        self.league_layout = has_league_layout(self.teams)
+
+    def bracket(self, ranks):
+        if self.league_layout:
+            return league_bracket(self.teams, ranks)
+        return seeded_bracket(ranks, min(PLAYOFF_TEAMS, len(self.teams)))
+
+    def series_matrix(self, ranks):
+        ranks = np.asarray(ranks)
+        better = ranks[:, None] < ranks[None, :]
+        return np.where(better, self.series_home, 1 - self.series_home.T)
+
+    def round_odds(self, ranks):
+        """(len(ROUNDS) x teams) probabilities of winning each round, plus the bracket."""
+        bracket = self.bracket(ranks)
+        series = self.series_matrix(ranks)
+        n = len(self.teams)
+        rounds = np.zeros((len(ROUNDS), n))
+        # Smaller brackets skip the early rounds; the final is always win_cup
+        first = len(ROUNDS) - (len(bracket_teams(bracket)).bit_length() - 1)
+
+        def advance(node):
+            if not isinstance(node, tuple):
+                probs = np.zeros(n)
+                probs[node] = 1.0
+                return probs, first - 1
+            (left, depth), (right, _) = advance(node[0]), advance(node[1])
+            winner = left * (series @ right) + right * (series @ left)
+            rounds[depth + 1] += winner
+            return winner, depth + 1
+
+        advance(bracket)
+        return rounds, bracket
+
+    def first_round(self, ranks, bracket=None):
+        """First-round series as (higher seed, lower seed, higher seed's series odds)."""
+        ranks = np.asarray(ranks)
+        series = self.series_matrix(ranks)
+        matchups = []
+
+        def collect(node):
+            if isinstance(node[0], tuple):
+                collect(node[0])
+                collect(node[1])
+            else:
+                high, low = sorted(node, key=lambda i: ranks[i])
+                matchups.append((self.teams[high], self.teams[low], float(series[high, low])))
+
+        collect(bracket if bracket is not None else self.bracket(ranks))
+        return matchups
+
+    def sampled_odds(self, strength_values, home, away, n_seasons, seed=None, chunk_size=PLAYOFF_CHUNK_SIZE):
+        """Round odds averaged over `n_seasons` sampled regular seasons."""
+        totals = np.zeros((len(ROUNDS) + 1, len(self.teams)))
+        for block, rng in chunk_generators(seed, n_seasons, chunk_size):
+            points, wins, _ = simulate_season_block(strength_values, home, away, block, rng)
+            for ranks in season_ranks(standings_keys(points, wins)):
+                rounds, bracket = self.round_odds(ranks)
+                totals[1:] += rounds
+                totals[0][bracket_teams(bracket)] += 1
+        return totals / max(n_seasons, 1)
+
+def odds_summary(teams, odds):
+    """Rows of make_playoffs plus ROUNDS per team, most likely champion first."""
+    keys = ["make_playoffs"] + ROUNDS
+    rows = [
+        {"team": team, **{key: round(float(odds[k, i]), 4) for k, key in enumerate(keys)}}
+        for i, team in enumerate(teams)
+    ]
+    return sorted(rows, key=lambda r: (r["win_cup"], r["make_playoffs"]), reverse=True)
+
+class PlayoffTable:
+    """PlayoffModel for the current season strengths, rebuilt only when their version changes."""
+
+    def __init__(self):
+        self._key = None
+        self._model = None
+
+    def get(self, teams, strengths, version):
+        key = (tuple(teams), version)
+        if key != self._key:
+            self._model = PlayoffModel(teams, HeadToHead(teams, strengths))
+            self._key = key
+        return self._model
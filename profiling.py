@@ -0,0 +1,193 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import g, request
+
+ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+SAMPLE_INTERVAL = 0.001  # seconds between stack samples
+TOP_FUNCTIONS = 40
+MAX_PROFILES = 50
+MODES = ("cprofile", "sample")
+FORMATS = {"text": ".txt", "collapsed": ".collapsed", "pstats": ".pstats"}
+PROFILE_ID = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{8}$")
+
+class SamplingProfiler:
+    """Samples one thread's stack every `interval` seconds from a background thread.
+
+    Much lower overhead than cProfile on call-heavy code such as the
+    per-game loop, and the samples map directly onto collapsed stacks.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL, skip=0):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.skip = skip  # outermost frames to drop (server and WSGI plumbing)
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack = stack[::-1][self.skip:]
+            if stack and not self._stop.is_set():
+                self.stacks[";".join(stack)] += 1
+
+    def collapsed(self):
+        """flamegraph.pl / speedscope input: one "frame;frame;frame count" line per stack."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def ranked(self, top=TOP_FUNCTIONS):
+        total = sum(self.stacks.values()) or 1
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+
+        lines = [f"{total} samples every {self.interval * 1000:g} ms", "",
+                 f"{'total%':>8} {'self%':>8}  function"]
+        for frame, count in inclusive.most_common(top):
+            lines.append(f"{100 * count / total:8.1f} {100 * own[frame] / total:8.1f}  {frame}")
+        return "\n".join(lines) + "\n"
+
+def _dispatch_depth():
+    """Stack depth of Flask's full_dispatch_request frame, so samples start at the view."""
+    frames = []
+    frame = sys._getframe()
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    for depth, frame in enumerate(reversed(frames)):
+        if frame.f_code.co_name == "full_dispatch_request":
+            return depth
+    return 0
+
+def requested_mode():
+    """Profiler asked for by the X-Profile header or ?profile= flag, if any."""
+    mode = request.headers.get("X-Profile") or request.args.get("profile")
+    if not mode:
+        return None
+    mode = mode.lower()
+    if mode in ("1", "true", "yes"):
+        return "cprofile"
+    return mode if mode in MODES else None
+
+def active():
+    """True while the current request is being profiled."""
+    return "profiler" in g
+
+def report_path(profile_id, fmt="text"):
+    if not PROFILE_ID.match(profile_id) or fmt not in FORMATS:
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id + FORMATS[fmt])
+    return path if os.path.exists(path) else None
+
+def _save(profiler, mode, label, elapsed):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    base = os.path.join(PROFILE_DIR, profile_id)
+    header = f"{label}\n{mode} profile, {elapsed * 1000:.1f} ms wall time\n\n"
+
+    if mode == "cprofile":
+        profiler.dump_stats(base + FORMATS["pstats"])
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        report = stream.getvalue()
+    else:
+        report = profiler.ranked()
+        with open(base + FORMATS["collapsed"], "w") as f:
+            f.write(profiler.collapsed())
+
+    with open(base + FORMATS["text"], "w") as f:
+        f.write(header + report)
+    _prune()
+    return profile_id
+
+def _prune():
+    reports = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(FORMATS["text"]))
+    for name in reports[:max(0, len(reports) - MAX_PROFILES)]:
+        profile_id = name[:-len(FORMATS["text"])]
+        for suffix in FORMATS.values():
+            path = os.path.join(PROFILE_DIR, profile_id + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+def install(app):
+    """Profile single requests on demand; nothing is hooked unless PROFILING_ENABLED=1.
+
+    The report id comes back in the X-Profile-Id header and can be fetched
+    from /api/profiles/<id>. Streaming responses are only profiled up to
+    the point where the response object is returned.
+
+    Profiled requests skip the result and response body caches and run
+    their simulation inline (see active()), so a repeated seeded call is
+    measured rather than a cache hit. Work sent to the process pool is not
+    profiled. Under gevent the sampler thread is a greenlet that cannot
+    run while a simulation holds the hub, so "sample" falls back to
+    cprofile there.
+    """
+    if not ENABLED:
+        return
+
+    import parallel
+
+    @app.before_request
+    def start_profiler():
+        mode = requested_mode()
+        if mode is None:
+            return
+        if mode == "sample" and parallel.gevent_patched():
+            mode = "cprofile"
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = SamplingProfiler(threading.get_ident(), skip=_dispatch_depth())
+            profiler.start()
+        g.profiler = (mode, profiler, time.perf_counter())
+
+    @app.after_request
+    def stop_profiler(response):
+        state = g.pop("profiler", None)
+        if state is None:
+            return response
+        mode, profiler, started = state
+        if mode == "cprofile":
+            profiler.disable()
+        else:
+            profiler.stop()
+
+        label = f"{request.method} {request.full_path.rstrip('?')}"
+        response.headers["X-Profile-Id"] = _save(profiler, mode, label, time.perf_counter() - started)
+        return response
+
+    @app.teardown_request
+    def discard_profiler(error):
+        # after_request is skipped when the view raises; don't leave a profiler running
+        state = g.pop("profiler", None)
+        if state is not None:
+            mode, profiler, _ = state
+            profiler.disable() if mode == "cprofile" else profiler.stop()
@@ -0,0 +1,190 @@
+import argparse
+import json
+import numpy as np
+
+import calculate_team_ratings as avg_model
+from create_ratings import STAT_FIELDS, load_columns, normalize_columns, weight_vector
+from static import team_ratings as tier_model
+
+PLAYER_STATS_FILE = "player_ratings.json"
+MERGED_PLAYERS_FILE = "static/merged_players.json"
+REPORT_FILE = "weight_sweep_report.json"
+BLOCK_SIZE = 2000  # configs per stacked block
+
+TIER_PARAMS = ["franchise_multiplier", "core_multiplier", "depth_multiplier",
+               "one_franchise_bonus", "two_franchise_bonus"]
+
+def default_tier_vector():
+    return np.array([
+        tier_model.FRANCHISE_MULTIPLIER, tier_model.CORE_MULTIPLIER, tier_model.DEPTH_MULTIPLIER,
+        tier_model.ONE_FRANCHISE_BONUS, tier_model.TWO_FRANCHISE_BONUS
+    ], dtype=float)
+
+class SweepData:
+    """Fixed league layout shared by every config: normalized stats and team membership.
+
+    Everything is derived from player_ratings.json and merged_players.json,
+    so the default config reproduces what a fresh pipeline run writes to
+    team_ratings.json and static/normalized_ratings.json. The committed
+    copies of those files can lag their inputs; run pipeline.py before
+    comparing against them.
+    """
+
+    def __init__(self, stats, merged_players, method="minmax"):
+        rows, columns = load_columns(stats)
+        positions = [player["position"] for _, player in rows]
+        self.normalized = normalize_columns(columns, positions, method)
+        self.teams = list(stats)
+
+        # team_rosters view (calculate_team_ratings): every rated player on their stats team
+        team_index = {team: i for i, team in enumerate(self.teams)}
+        self.player_team = np.array([team_index[team] for team, _ in rows])
+        self.roster_sizes = np.bincount(self.player_team, minlength=len(self.teams))
+
+        # merged_players view (static/team_ratings): rated players pick up their new
+        # rating by id, goalies and unmatched skaters keep their fixed fallback
+        row_of_id = {player["id"]: i for i, (_, player) in enumerate(rows)}
+        merged = [p for p in merged_players if p["team"] in team_index]
+        self.merged_team = np.array([team_index[p["team"]] for p in merged])
+        self.merged_row = np.array([row_of_id.get(p["id"], -1) for p in merged])
+        self.merged_fixed = np.array([p.get("rating", 0) for p in merged], dtype=float)
+        # static/team_ratings only rates teams that appear in merged_players
+        self.strength_mask = np.bincount(self.merged_team, minlength=len(self.teams)) > 0
+        self.strength_teams = [team for team, ok in zip(self.teams, self.strength_mask) if ok]
+
+    def _team_sums(self, team_idx, values):
+        one_hot = np.zeros((len(self.teams), len(team_idx)))
+        one_hot[team_idx, np.arange(len(team_idx))] = 1
+        return one_hot @ values
+
+    def evaluate(self, stat_weights, tier_params):
+        """Ratings for K configs at once.
+
+        stat_weights is (K x stats) and tier_params is (K x 5). Returns
+        (team_ratings, strengths): team_ratings is (teams x K) and strengths
+        is (strength_teams x K).
+        """
+        player_ratings = np.rint(75 + (self.normalized @ stat_weights.T) * 25)
+
+        averages = self._team_sums(self.player_team, player_ratings) / np.maximum(self.roster_sizes, 1)[:, None]
+        transformed = averages ** avg_model.EXPONENT
+        low, high = transformed.min(axis=0), transformed.max(axis=0)
+        span = np.where(high == low, 1, high - low)
+        team_ratings = np.where(
+            high == low, avg_model.MIN_RATING,
+            np.rint(avg_model.MIN_RATING + (transformed - low) / span * (avg_model.MAX_RATING - avg_model.MIN_RATING))
+        )
+
+        merged = np.where(
+            self.merged_row[:, None] >= 0, player_ratings[np.maximum(self.merged_row, 0)], self.merged_fixed[:, None]
+        )
+        franchise = merged >= tier_model.FRANCHISE_RATING
+        core = ~franchise & (merged >= tier_model.CORE_RATING)
+        multiplier = np.where(franchise, tier_params[:, 0], np.where(core, tier_params[:, 1], tier_params[:, 2]))
+        weighted = self._team_sums(self.merged_team, merged * multiplier)
+        franchise_count = self._team_sums(self.merged_team, franchise.astype(float))
+        bonus = np.where(franchise_count >= 2, tier_params[:, 4], np.where(franchise_count == 1, tier_params[:, 3], 0))
+        raw = np.rint(weighted + bonus)[self.strength_mask]
+
+        low, high = raw.min(axis=0), raw.max(axis=0)
+        span = np.where(high == low, 1, high - low)
+        strengths = np.where(
+            high == low, 1.0,
+            np.round(tier_model.MIN_STRENGTH + (raw - low) / span * (tier_model.MAX_STRENGTH - tier_model.MIN_STRENGTH), 2)
+        )
+        return team_ratings, strengths
+
+def ranks(values):
+    # Rank 1 = strongest; ties broken by team order like a stable sort
+    order = np.argsort(-values, axis=0, kind="stable")
+    result = np.empty_like(order)
+    result[order, np.arange(values.shape[1])] = np.arange(1, values.shape[0] + 1)[:, None]
+    return result
+
+def random_configs(n, jitter, tier_jitter, seed=None):
+    """Log-normal perturbations of the default weights, rescaled to the default total."""
+    rng = np.random.default_rng(seed)
+    base = weight_vector()
+    stat_weights = base * np.exp(rng.normal(0, jitter, (n, len(base))))
+    stat_weights *= base.sum() / stat_weights.sum(axis=1, keepdims=True)
+    tier_params = default_tier_vector() * np.exp(rng.normal(0, tier_jitter, (n, len(TIER_PARAMS))))
+    return stat_weights, tier_params
+
+def load_configs(path):
+    """Read [{"weights": {...}, "tiers": {...}}, ...]; missing keys fall back to the defaults."""
+    with open(path, "r") as f:
+        configs = json.load(f)
+    default_tiers = dict(zip(TIER_PARAMS, default_tier_vector()))
+    stat_weights = np.array([weight_vector({**dict(zip(STAT_FIELDS, weight_vector())), **c.get("weights", {})})
+                             for c in configs])
+    tier_params = np.array([[{**default_tiers, **c.get("tiers", {})}[p] for p in TIER_PARAMS] for c in configs])
+    return stat_weights, tier_params
+
+def rank_summary(teams, config_ranks, baseline_ranks):
+    shifts = config_ranks - baseline_ranks[:, None]
+    per_team = [
+        {
+            "team": team,
+            "baseline_rank": int(baseline_ranks[i]),
+            "mean_rank": round(float(config_ranks[i].mean()), 2),
+            "best_rank": int(config_ranks[i].min()),
+            "worst_rank": int(config_ranks[i].max()),
+            "mean_abs_shift": round(float(np.abs(shifts[i]).mean()), 2)
+        } for i, team in enumerate(teams)
+    ]
+    per_config_shift = np.abs(shifts).mean(axis=0)
+    return {
+        "mean_abs_shift": round(float(per_config_shift.mean()), 3),
+        "max_abs_shift": int(np.abs(shifts).max()),
+        "teams": sorted(per_team, key=lambda r: r["mean_abs_shift"], reverse=True)
+    }
+
+def sweep(data, stat_weights, tier_params, block_size=BLOCK_SIZE):
+    base_ratings, base_strengths = data.evaluate(weight_vector()[None, :], default_tier_vector()[None, :])
+    baseline = {"team_rating": ranks(base_ratings)[:, 0], "strength": ranks(base_strengths)[:, 0]}
+
+    rating_ranks, strength_ranks = [], []
+    for start in range(0, len(stat_weights), block_size):
+        block = slice(start, start + block_size)
+        team_ratings, strengths = data.evaluate(stat_weights[block], tier_params[block])
+        rating_ranks.append(ranks(team_ratings))
+        strength_ranks.append(ranks(strengths))
+
+    return {
+        "configs": len(stat_weights),
+        "team_rating": rank_summary(data.teams, np.hstack(rating_ranks), baseline["team_rating"]),
+        "strength": rank_summary(data.strength_teams, np.hstack(strength_ranks), baseline["strength"])
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep stat weights and tier parameters and report team rank shifts.")
+    parser.add_argument("--configs", help="JSON list of {weights, tiers} configs to evaluate")
+    parser.add_argument("--samples", type=int, default=5000, help="random configs when --configs is not given")
+    parser.add_argument("--jitter", type=float, default=0.25, help="log-normal sigma for stat weights")
+    parser.add_argument("--tier-jitter", type=float, default=0.1, help="log-normal sigma for tier parameters")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", default=REPORT_FILE)
+    args = parser.parse_args()
+
+    with open(PLAYER_STATS_FILE, "r") as f:
+        stats = json.load(f)
+    with open(MERGED_PLAYERS_FILE, "r") as f:
+        merged_players = json.load(f)
+
+    if args.configs:
+        stat_weights, tier_params = load_configs(args.configs)
+    else:
+        stat_weights, tier_params = random_configs(args.samples, args.jitter, args.tier_jitter, args.seed)
+
+    report = sweep(SweepData(stats, merged_players), stat_weights, tier_params)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    movers = ", ".join(f"{t['team']} ({t['mean_abs_shift']})" for t in report["strength"]["teams"][:5])
+    print(f"✅ Evaluated {report['configs']} configs, mean strength rank shift "
+          f"{report['strength']['mean_abs_shift']}; most sensitive: {movers}")
+    print(f"✅ Sweep report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+class ResultCache:
+    """LRU cache for deterministic simulation results.
+
+    Entries are keyed by (data fingerprint, endpoint, parameters, seed), so a
+    change to the ratings or rosters produces new keys. Entries for several
+    fingerprints (the live data and any what-if scenarios) share the LRU;
+    purge(fingerprint) drops one of them once its data has been replaced.
+    Requests without a seed are random by design and are never cached.
+
+    With `disk_dir` set, results are also written there as JSON files so
+    several server processes can share them; the directory is pruned
+    oldest-first once it holds more than `max_disk_entries` files.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None, max_disk_entries=5000):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._writes = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(fingerprint, endpoint, params, seed):
+        digest = hashlib.sha256(json.dumps([endpoint, params, seed], sort_keys=True).encode()).hexdigest()
+        return f"{fingerprint}-{digest[:32]}"
+
+    def get_or_compute(self, fingerprint, endpoint, params, seed, compute):
+        if seed is None or self.max_entries <= 0:
+            return compute()
+
+        key = self.key(fingerprint, endpoint, params, seed)
+        value = self._get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = compute()
+        self._put(key, value)
+        return value
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if not self.disk_dir:
+            return None
+
+        path = os.path.join(self.disk_dir, key + ".json")
+        try:
+            with open(path, "r") as f:
+                value = json.load(f)
+            os.utime(path)  # disk LRU goes by mtime
+        except (OSError, ValueError):
+            return None
+        self._remember(key, value)
+        return value
+
+    def _put(self, key, value):
+        self._remember(key, value)
+        if not self.disk_dir:
+            return
+
+        # Write-then-rename so other processes never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp, os.path.join(self.disk_dir, key + ".json"))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._prune_disk()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_files(self):
+        try:
+            return [name for name in os.listdir(self.disk_dir) if name.endswith(".json")]
+        except OSError:
+            return []
+
+    def _purge_disk(self, should_remove):
+        for name in self._disk_files():
+            if should_remove(name):
+                try:
+                    os.remove(os.path.join(self.disk_dir, name))
+                except OSError:
+                    pass  # another process got there first
+
+    def _prune_disk(self):
+        files = []
+        for name in self._disk_files():
+            try:
+                files.append((os.stat(os.path.join(self.disk_dir, name)).st_mtime, name))
+            except OSError:
+                pass
+        excess = {name for _, name in sorted(files)[:max(0, len(files) - self.max_disk_entries)]}
+        self._purge_disk(excess.__contains__)
+
+    def purge(self, fingerprint):
+        """Drop every entry computed from the data with this fingerprint."""
+        prefix = fingerprint + "-"
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+        if self.disk_dir:
+            self._purge_disk(lambda name: name.startswith(prefix))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            self._purge_disk(lambda name: True)
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
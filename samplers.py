@@ -0,0 +1,84 @@
+import numpy as np
+
+# Bias toward 1 or 2 assists per goal
+ASSIST_COUNTS = np.array([0, 1, 2])
+ASSIST_WEIGHTS = np.array([0.1, 0.45, 0.45])
+MAX_ASSISTS = 2
+
+class RosterSampler:
+    """Rating-weighted player draws for one roster.
+
+    Keeps a cumulative rating table so each draw is a `searchsorted` instead
+    of a scan over the roster. Draws that must skip some players (the scorer,
+    the first assist) shift the uniform variate past the excluded players'
+    slots rather than rebuilding the table.
+    """
+
+    def __init__(self, players):
+        self.players = players
+        self.names = [p["name"] for p in players]
+        self.ids = np.array([p["id"] for p in players], dtype=np.int64)
+        self.weights = np.array([p["rating"] for p in players], dtype=float)
+        self.cumulative = np.cumsum(self.weights)
+        self.starts = self.cumulative - self.weights
+        self.total = float(self.cumulative[-1]) if players else 0.0
+
+    @classmethod
+    def from_ratings(cls, ratings):
+        """Sampler over bare ratings, for worker processes that only need draw indices."""
+        return cls([{"id": i, "name": "", "rating": float(r)} for i, r in enumerate(ratings)])
+
+    def __len__(self):
+        return len(self.players)
+
+    def _lookup(self, u):
+        return np.minimum(np.searchsorted(self.cumulative, u, side="right"), len(self) - 1)
+
+    def draw(self, size, rng):
+        if not self.players:
+            raise ValueError("Cannot draw players from an empty roster")
+        return self._lookup(rng.random(size) * self.total)
+
+    def draw_excluding(self, excluded, rng):
+        """One draw per row of `excluded` (player indices, -1 for none), skipping those players."""
+        excluded = np.sort(np.atleast_2d(excluded), axis=1)
+        valid = excluded >= 0
+        safe = np.where(valid, excluded, 0)
+        removed = np.where(valid, self.weights[safe], 0.0)
+
+        u = rng.random(len(excluded)) * (self.total - removed.sum(axis=1))
+        for col in range(excluded.shape[1]):
+            shift = valid[:, col] & (u >= self.starts[safe[:, col]])
+            u = np.where(shift, u + removed[:, col], u)
+        return self._lookup(u)
+
+    def draw_goals(self, n_goals, rng):
+        """Draw scorers and up to MAX_ASSISTS distinct assists for `n_goals` goals.
+
+        Returns (scorers, assists) where assists is (n_goals, MAX_ASSISTS)
+        padded with -1.
+        """
+        scorers = self.draw(n_goals, rng)
+        n_assists = rng.choice(ASSIST_COUNTS, size=n_goals, p=ASSIST_WEIGHTS)
+        n_assists = np.minimum(n_assists, len(self) - 1)
+
+        assists = np.full((n_goals, MAX_ASSISTS), -1, dtype=np.intp)
+        excluded = scorers[:, None]
+        for slot in range(MAX_ASSISTS):
+            picks = self.draw_excluding(excluded, rng)
+            assists[:, slot] = np.where(n_assists > slot, picks, -1)
+            excluded = np.column_stack([excluded, assists[:, slot]])
+        return scorers, assists
+
+class SamplerTable:
+    """Per-team RosterSamplers, rebuilt only when the roster data version changes."""
+
+    def __init__(self):
+        self._version = None
+        self._samplers = {}
+
+    def get(self, rosters, version):
+        if version != self._version:
+            self._samplers = {team: RosterSampler(players) for team, players in rosters.items()}
+            self._version = version
+        return self._samplers
@@ -0,0 +1,103 @@
+from functools import lru_cache
+
+import numpy as np
+
+from league import DIVISIONS, has_league_layout, same_conference
+
+# Games against each opponent in the 82-game league format:
+# 5 division rivals x 4 + 2 division rivals x 3, 8 conference teams x 3,
+# 16 teams from the other conference x 2.
+DIVISION_GAMES_HIGH = 4
+DIVISION_GAMES_LOW = 3
+CONFERENCE_GAMES = 3
+INTER_CONFERENCE_GAMES = 2
+LEAGUE_GAMES_PER_TEAM = 82
+
+def _pair(t1, t2):
+    return tuple(sorted((t1, t2)))
+
+def _league_schedule(rng):
+    matchup_counts = {}
+    for i, div in enumerate(DIVISIONS):
+        for other in DIVISIONS[i + 1:]:
+            games = CONFERENCE_GAMES if same_conference(div[0], other[0]) else INTER_CONFERENCE_GAMES
+            for t1 in div:
+                for t2 in other:
+                    matchup_counts[_pair(t1, t2)] = games
+
+        # Neighbours on a cycle through the division play three times,
+        # which gives every team exactly two three-game division rivals.
+        order = list(div)
+        if rng:
+            order = [order[i] for i in rng.permutation(len(order))]
+        for a in range(len(order)):
+            for b in range(a + 1, len(order)):
+                neighbours = b - a == 1 or (a == 0 and b == len(order) - 1)
+                games = DIVISION_GAMES_LOW if neighbours else DIVISION_GAMES_HIGH
+                matchup_counts[_pair(order[a], order[b])] = games
+
+    return matchup_counts
+
+def _balanced_schedule(teams, games_per_team, rng):
+    n = len(teams)
+    if n < 2:
+        raise ValueError("A schedule needs at least two teams")
+    if (n * games_per_team) % 2:
+        raise ValueError(f"{n} teams cannot each play {games_per_team} games")
+
+    # Everyone meets everyone `base` times; the remaining `extra` games per
+    # team come from a circulant `extra`-regular graph over the teams.
+    base, extra = divmod(games_per_team, n - 1)
+    order = list(teams)
+    if rng:
+        order = [order[i] for i in rng.permutation(n)]
+
+    matchup_counts = {}
+    for a in range(n):
+        for b in range(a + 1, n):
+            offset = min(b - a, n - (b - a))
+            bonus = offset <= extra // 2 or (extra % 2 == 1 and offset == n // 2)
+            games = base + (1 if bonus else 0)
+            if games:
+                matchup_counts[_pair(order[a], order[b])] = games
+
+    return matchup_counts
+
+@lru_cache(maxsize=64)
+def _cached_schedule(team_key, games_per_team, seed):
+    rng = np.random.default_rng(seed) if seed is not None else None
+    if games_per_team == LEAGUE_GAMES_PER_TEAM and has_league_layout(team_key):
+        return _league_schedule(rng)
+    return _balanced_schedule(team_key, games_per_team, rng)
+
+def schedule_cache_info():
+    """Hits and misses (= schedules actually built) of the schedule memo."""
+    return _cached_schedule.cache_info()
+
+def generate_fair_schedule(teams, games_per_team=82, seed=None):
+    """Build a {(team1, team2): games} matchup matrix where every team plays `games_per_team`.
+
+    Construction is deterministic for a given team set and seed, and the
+    result is cached so repeat requests skip generation entirely.
+    """
+    return dict(_cached_schedule(tuple(sorted(teams)), games_per_team, seed))
+
+def schedule_game_days(schedule, rng=None):
+    """Spread a matchup matrix over game days where each team plays at most once per day."""
+    rng = rng or np.random.default_rng()
+    games = [pair for pair, count in schedule.items() for _ in range(count)]
+    remaining = [games[i] for i in rng.permutation(len(games))]
+
+    days = []
+    while remaining:
+        busy = set()
+        today, later = [], []
+        for t1, t2 in remaining:
+            if t1 in busy or t2 in busy:
+                later.append((t1, t2))
+            else:
+                busy.update((t1, t2))
+                today.append((t1, t2))
+        days.append(today)
+        remaining = later
+    return days
@@ -0,0 +1,363 @@
+import numpy as np
+from league import CONFERENCES, has_league_layout
+
+BASE_RATE = 4.8
+MAX_SCORE = 10
+BLOWOUT_SCORE = 8
+UPSET_CHANCE = 0.05
+
+PLAYOFF_SPOTS_PER_DIVISION = 3
+WILD_CARDS_PER_CONFERENCE = 2
+PLAYOFF_TEAMS = 16
+
+PERCENTILES = (5, 25, 50, 75, 95)
+MAX_SEASONS = 100000
+CHUNK_SIZE = 500  # seasons per vectorized block, keeps (chunk x games) arrays small
+
+def chunk_seeds(seed, n_seasons, chunk_size):
+    """Split `n_seasons` into chunks, each with an independent child SeedSequence of `seed`.
+
+    `seed` may be an int, a SeedSequence or None (fresh entropy). The same
+    seed and chunk size always reproduce the same draws, however the chunks
+    are later scheduled.
+    """
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    n_chunks = -(-n_seasons // chunk_size)
+    sizes = [min(chunk_size, n_seasons - i * chunk_size) for i in range(n_chunks)]
+    return list(zip(sizes, sequence.spawn(n_chunks)))
+
+def chunk_generators(seed, n_seasons, chunk_size):
+    return [(size, np.random.default_rng(child)) for size, child in chunk_seeds(seed, n_seasons, chunk_size)]
+
+def season_streams(seed):
+    """Independent (schedule seed, game Generator) child streams for one season.
+
+    The schedule gets a plain integer drawn from its own child SeedSequence,
+    so generate_fair_schedule can still memoize it. Without a seed the
+    schedule stays unshuffled and the games use fresh entropy.
+    """
+    if seed is None:
+        return None, np.random.default_rng()
+    schedule_sequence, game_sequence = np.random.SeedSequence(seed).spawn(2)
+    return int(schedule_sequence.generate_state(1)[0]), np.random.default_rng(game_sequence)
+
+# --- Game model ---
+
+def blowout_chance(str1, str2):
+    return np.clip(0.05 + (np.asarray(str1) - str2) * 0.1, 0.0, 0.3)
+
+def simulate_games(str1, str2, size, rng):
+    """Vectorized version of app.simulate_game; str1/str2 broadcast to `size`."""
+    str1 = np.broadcast_to(str1, size)
+    str2 = np.broadcast_to(str2, size)
+
+    score1 = np.minimum(rng.poisson(BASE_RATE * str1), MAX_SCORE)
+    score2 = np.minimum(rng.poisson(BASE_RATE * str2), MAX_SCORE)
+
+    blowout = rng.random(size) < blowout_chance(str1, str2)
+    upset = ~blowout & (rng.random(size) < UPSET_CHANCE)
+    low = rng.integers(0, 3, size)
+    high = rng.integers(4, 6, size)
+    coin = rng.integers(1, 3, size)
+
+    tie = score1 == score2
+    winner = np.where(score1 > score2, 1, 2)
+    tie_winner = np.where(str1 > str2, 1, np.where(str2 > str1, 2, coin))
+    winner = np.where(tie, tie_winner, winner)
+
+    upset1 = upset & (str1 < str2)
+    upset2 = upset & (str2 < str1)
+    score1 = np.where(upset1, high, np.where(upset2, low, score1))
+    score2 = np.where(upset1, low, np.where(upset2, high, score2))
+    winner = np.where(upset1, 1, np.where(upset2, 2, winner))
+
+    blowout1 = blowout & (str1 > str2)
+    blowout2 = blowout & ~(str1 > str2)
+    score1 = np.where(blowout1, BLOWOUT_SCORE, np.where(blowout2, low, score1))
+    score2 = np.where(blowout1, low, np.where(blowout2, BLOWOUT_SCORE, score2))
+    winner = np.where(blowout1, 1, np.where(blowout2, 2, winner))
+
+    tie &= ~(blowout | upset1 | upset2)
+    return score1, score2, winner, tie
+
+def simulate_matchups(str1, str2, repeats, rng, game_fn=simulate_games):
+    """Play repeats[k] games of str1[k] vs str2[k] in one vectorized pass.
+
+    Returns the matchup index of every game followed by game_fn's arrays.
+    """
+    matchup = np.repeat(np.arange(len(repeats)), repeats)
+    return (matchup,) + tuple(game_fn(np.asarray(str1)[matchup], np.asarray(str2)[matchup], len(matchup), rng))
+
+# --- Season aggregation ---
+
+def expand_schedule(schedule, teams):
+    """Turn a {(team1, team2): count} schedule into flat home/away index arrays."""
+    index = {team: i for i, team in enumerate(teams)}
+    home, away = [], []
+    for (team1, team2), count in schedule.items():
+        home.extend([index[team1]] * count)
+        away.extend([index[team2]] * count)
+    return np.array(home, dtype=np.intp), np.array(away, dtype=np.intp)
+
+def _per_team_totals(values1, values2, home, away, n_teams):
+    n_seasons = values1.shape[0]
+    offsets = (np.arange(n_seasons) * n_teams)[:, None]
+    idx = np.concatenate([(offsets + home).ravel(), (offsets + away).ravel()])
+    weights = np.concatenate([values1.ravel(), values2.ravel()])
+    totals = np.bincount(idx, weights=weights, minlength=n_seasons * n_teams)
+    return totals.reshape(n_seasons, n_teams).astype(np.int64)
+
+def standings_keys(points, wins):
+    # Same ordering as the single-season standings: points, then wins
+    return points * 1000 + wins
+
+def season_ranks(keys):
+    order = np.argsort(-keys, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    rows = np.arange(keys.shape[0])[:, None]
+    ranks[rows, order] = np.arange(keys.shape[1])
+    return ranks
+
+def playoff_mask(keys, teams):
+    """Boolean (seasons x teams) mask of playoff qualifiers.
+
+    Uses the division format (top three per division plus two conference
+    wild cards) when the teams match the league layout, otherwise the top
+    PLAYOFF_TEAMS overall.
+    """
+    n_seasons, n_teams = keys.shape
+    mask = np.zeros((n_seasons, n_teams), dtype=bool)
+    rows = np.arange(n_seasons)[:, None]
+
+    if not has_league_layout(teams):
+        top = np.argsort(-keys, axis=1, kind="stable")[:, :min(PLAYOFF_TEAMS, n_teams)]
+        mask[rows, top] = True
+        return mask
+
+    index = {team: i for i, team in enumerate(teams)}
+    for divisions in CONFERENCES:
+        conf_idx = []
+        for div in divisions:
+            div_idx = np.array([index[t] for t in div])
+            order = np.argsort(-keys[:, div_idx], axis=1, kind="stable")
+            mask[rows, div_idx[order[:, :PLAYOFF_SPOTS_PER_DIVISION]]] = True
+            conf_idx.extend(div_idx)
+
+        conf_idx = np.array(conf_idx)
+        remaining = np.where(mask[:, conf_idx], -1, keys[:, conf_idx])
+        order = np.argsort(-remaining, axis=1, kind="stable")
+        mask[rows, conf_idx[order[:, :WILD_CARDS_PER_CONFERENCE]]] = True
+
+    return mask
+
+class SeasonAggregate:
+    """Mergeable per-team totals over many simulated seasons."""
+
+    def __init__(self, n_teams, max_points):
+        self.seasons = 0
+        self.points_hist = np.zeros((n_teams, max_points + 1), dtype=np.int64)
+        self.rank_counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+        self.playoff_counts = np.zeros(n_teams, dtype=np.int64)
+        self.wins_total = np.zeros(n_teams, dtype=np.int64)
+        self.goal_diff_total = np.zeros(n_teams, dtype=np.int64)
+
+    def add(self, points, wins, goal_diff, ranks, playoffs):
+        n_seasons, n_teams = points.shape
+        width = self.points_hist.shape[1]
+        team_idx = np.broadcast_to(np.arange(n_teams), points.shape)
+
+        self.seasons += n_seasons
+        self.points_hist += np.bincount(
+            (team_idx * width + points).ravel(), minlength=n_teams * width
+        ).reshape(n_teams, width)
+        self.rank_counts += np.bincount(
+            (team_idx * n_teams + ranks).ravel(), minlength=n_teams * n_teams
+        ).reshape(n_teams, n_teams)
+        self.playoff_counts += playoffs.sum(axis=0)
+        self.wins_total += wins.sum(axis=0)
+        self.goal_diff_total += goal_diff.sum(axis=0)
+
+    def merge(self, other):
+        self.seasons += other.seasons
+        self.points_hist += other.points_hist
+        self.rank_counts += other.rank_counts
+        self.playoff_counts += other.playoff_counts
+        self.wins_total += other.wins_total
+        self.goal_diff_total += other.goal_diff_total
+        return self
+
+    def points_percentiles(self, percentiles=PERCENTILES):
+        cdf = np.cumsum(self.points_hist, axis=1)
+        return {
+            p: (cdf < self.seasons * p / 100).sum(axis=1)
+            for p in percentiles
+        }
+
+    def summary(self, teams):
+        n = max(self.seasons, 1)
+        width = self.points_hist.shape[1]
+        mean_points = self.points_hist @ np.arange(width) / n
+        expected_rank = self.rank_counts @ np.arange(1, len(teams) + 1) / n
+        percentiles = self.points_percentiles()
+
+        rows = [
+            {
+                "team": team,
+                "expected_rank": round(float(expected_rank[i]), 2),
+                "playoff_probability": round(float(self.playoff_counts[i] / n), 4),
+                "mean_points": round(float(mean_points[i]), 2),
+                "mean_wins": round(float(self.wins_total[i] / n), 2),
+                "mean_goal_diff": round(float(self.goal_diff_total[i] / n), 2),
+                "points_percentiles": {
+                    f"p{p}": int(values[i]) for p, values in percentiles.items()
+                }
+            } for i, team in enumerate(teams)
+        ]
+        return sorted(rows, key=lambda r: r["expected_rank"])
+
+def simulate_season_block(strength_values, home, away, n_seasons, rng):
+    """Simulate `n_seasons` full seasons at once; returns (points, wins, goal_diff) per season and team."""
+    n_teams = len(strength_values)
+    size = (n_seasons, len(home))
+    score1, score2, winner, tie = simulate_games(
+        strength_values[home], strength_values[away], size, rng
+    )
+
+    win1 = winner == 1
+    win2 = ~win1
+    pts1 = 2 * win1 + (tie & win2)
+    pts2 = 2 * win2 + (tie & win1)
+
+    points = _per_team_totals(pts1, pts2, home, away, n_teams)
+    wins = _per_team_totals(win1, win2, home, away, n_teams)
+    goal_diff = _per_team_totals(score1 - score2, score2 - score1, home, away, n_teams)
+    return points, wins, goal_diff
+
+def add_season_chunk(aggregate, teams, strength_values, home, away, n_seasons, rng):
+    points, wins, goal_diff = simulate_season_block(strength_values, home, away, n_seasons, rng)
+    keys = standings_keys(points, wins)
+    aggregate.add(points, wins, goal_diff, season_ranks(keys), playoff_mask(keys, teams))
+
+def max_season_points(home, away, n_teams):
+    games_per_team = np.bincount(np.concatenate([home, away]), minlength=n_teams)
+    return 2 * int(games_per_team.max())
+
+def simulate_seasons(teams, strengths, schedule, n_seasons, seed=None, chunk_size=CHUNK_SIZE):
+    strength_values = np.array([strengths[t] for t in teams], dtype=float)
+    home, away = expand_schedule(schedule, teams)
+    aggregate = SeasonAggregate(len(teams), max_season_points(home, away, len(teams)))
+
+    for block, rng in chunk_generators(seed, n_seasons, chunk_size):
+        add_season_chunk(aggregate, teams, strength_values, home, away, block, rng)
+
+    return aggregate
+
+# --- Goal-level player projections ---
+
+GOAL_MODEL_BASE_RATE = 2.9
+GOAL_MODEL_MAX_GOALS = 8
+PLAYER_CHUNK_SIZE = 50
+
+class PlayerSeasonStats:
+    """Per-player goal/assist counters stored in arrays indexed by position in `ids`."""
+
+    def __init__(self, teams, samplers):
+        self.teams = teams
+        self.ids = np.concatenate([samplers[t].ids for t in teams])
+        self.team_of = np.repeat(np.arange(len(teams)), [len(samplers[t]) for t in teams])
+        self.offsets = np.concatenate([[0], np.cumsum([len(samplers[t]) for t in teams])])[:-1]
+        self.names = [name for t in teams for name in samplers[t].names]
+        self.positions = [p.get("position", "") for t in teams for p in samplers[t].players]
+        self.seasons = 0
+        self.goals = np.zeros(len(self.ids), dtype=np.int64)
+        self.assists = np.zeros(len(self.ids), dtype=np.int64)
+
+    def merge(self, other):
+        self.seasons += other.seasons
+        self.goals += other.goals
+        self.assists += other.assists
+        return self
+
+    def leaders(self, top=25, sort="points"):
+        n = max(self.seasons, 1)
+        points = self.goals + self.assists
+        key = {"goals": self.goals, "assists": self.assists}.get(sort, points)
+        order = np.lexsort((-points, -key))[:top]
+        return [
+            {
+                "id": int(self.ids[i]),
+                "name": self.names[i],
+                "team": self.teams[self.team_of[i]],
+                "position": self.positions[i],
+                "goals": round(float(self.goals[i] / n), 2),
+                "assists": round(float(self.assists[i] / n), 2),
+                "points": round(float(points[i] / n), 2)
+            } for i in order
+        ]
+
+def simulate_goal_games(str1, str2, size, rng):
+    """Vectorized app.simulate_game_with_scorers; returns (goals1, goals2, winner, tie) like simulate_games.
+
+    Scores are regulation goals, as the single-game route reports them.
+    Tied games are won in OT on a coin flip; that goal only exists for
+    scorer attribution, see ot_goals.
+    """
+    goals1 = np.minimum(rng.poisson(GOAL_MODEL_BASE_RATE * np.asarray(str1), size), GOAL_MODEL_MAX_GOALS)
+    goals2 = np.minimum(rng.poisson(GOAL_MODEL_BASE_RATE * np.asarray(str2), size), GOAL_MODEL_MAX_GOALS)
+
+    tie = goals1 == goals2
+    ot1 = tie & (rng.random(size) < 0.5)
+    winner = np.where(goals1 > goals2, 1, np.where(goals2 > goals1, 2, np.where(ot1, 1, 2)))
+    return goals1, goals2, winner, tie
+
+def ot_goals(winner, tie):
+    """The OT goal each side scored (0 or 1) in simulate_goal_games' tied games."""
+    return tie & (winner == 1), tie & (winner == 2)
+
+def player_chunk_counts(strength_values, home, away, team_samplers, offsets, n_players, n_seasons, rng):
+    """Goals and assists per player (indexed like PlayerSeasonStats) for one chunk of seasons."""
+    size = (n_seasons, len(home))
+    goals1, goals2, winner, tie = simulate_goal_games(strength_values[home], strength_values[away], size, rng)
+    ot1, ot2 = ot_goals(winner, tie)
+    goals1, goals2 = goals1 + ot1, goals2 + ot2
+
+    team_goals = np.bincount(
+        np.concatenate([np.broadcast_to(home, size).ravel(), np.broadcast_to(away, size).ravel()]),
+        weights=np.concatenate([goals1.ravel(), goals2.ravel()]),
+        minlength=len(team_samplers)
+    ).astype(np.int64)
+
+    goals = np.zeros(n_players, dtype=np.int64)
+    assists = np.zeros(n_players, dtype=np.int64)
+    for t, sampler in enumerate(team_samplers):
+        if team_goals[t] == 0:
+            continue
+        scorers, goal_assists = sampler.draw_goals(team_goals[t], rng)
+        goals += np.bincount(scorers + offsets[t], minlength=n_players)
+        goal_assists = goal_assists[goal_assists >= 0]
+        assists += np.bincount(goal_assists + offsets[t], minlength=n_players)
+    return goals, assists
+
+def simulate_player_seasons(teams, strengths, schedule, samplers, n_seasons, seed=None,
+                            chunk_size=PLAYER_CHUNK_SIZE):
+    """Run every scheduled game through the goal-level model and count per-player goals and assists."""
+    strength_values = np.array([strengths[t] for t in teams], dtype=float)
+    home, away = expand_schedule(schedule, teams)
+    stats = PlayerSeasonStats(teams, samplers)
+    team_samplers = [samplers[t] for t in teams]
+
+    for block, rng in chunk_generators(seed, n_seasons, chunk_size):
+        goals, assists = player_chunk_counts(
+            strength_values, home, away, team_samplers, stats.offsets, len(stats.ids), block, rng
+        )
+        stats.goals += goals
+        stats.assists += assists
+        stats.seasons += block
+
+    return stats
+
+def player_goal_counts(sampler, n_goals, rng):
+    """Goals and assists per roster player over `n_goals` goals drawn from `sampler`."""
+    scorers, assists = sampler.draw_goals(n_goals, rng)
+    assists = assists[assists >= 0]
+    return np.bincount(scorers, minlength=len(sampler)), np.bincount(assists, minlength=len(sampler))
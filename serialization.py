@@ -0,0 +1,141 @@
+import numpy as np
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+LAYOUTS = ("rows", "columns")
+
+class InvalidShape(ValueError):
+    pass
+
+def _default(obj):
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, encoding with orjson when it is installed.
+
+    Keys stay sorted as with the default provider. orjson writes UTF-8
+    rather than \\u escapes, which is equivalent JSON and shorter for
+    accented player names.
+    """
+
+    default = staticmethod(_default)
+
+    def encode(self, obj, pretty=False):
+        """Serialize `obj` to UTF-8 bytes."""
+        if orjson is None:
+            layout = {"indent": 2} if pretty else {"separators": (",", ":")}
+            return super().dumps(obj, **layout).encode()
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.encode(obj, pretty) + b"\n", mimetype=self.mimetype)
+
+# --- Response shaping ---
+
+def parse_fields(spec):
+    """"standings.team,standings.points" -> {"standings": {"team": None, "points": None}}.
+
+    None marks a field that is kept whole; naming a parent and one of its
+    children keeps the whole parent.
+    """
+    tree = {}
+    for path in spec.split(","):
+        parts = path.strip().split(".")
+        if not all(parts):
+            raise InvalidShape(f"Invalid field path {path.strip()!r}.")
+        node = tree
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if child is None:
+                break
+            node = child
+        else:
+            node[parts[-1]] = None
+    return tree
+
+def project(obj, tree):
+    """Keep only the fields in `tree`, applied to every element of lists along the way."""
+    if tree is None:
+        return obj
+    if isinstance(obj, list):
+        return [project(item, tree) for item in obj]
+    if isinstance(obj, dict):
+        return {key: project(obj[key], subtree) for key, subtree in tree.items() if key in obj}
+    return obj
+
+def columnar(obj):
+    """Turn every non-empty list of same-keyed dicts into a dict of parallel lists.
+
+    A game's goal list becomes {"team": [...], "scorer": [...], ...}, so
+    each key is written once instead of once per goal. Empty lists and
+    lists of differently shaped records are left as lists.
+    """
+    if isinstance(obj, dict):
+        return {key: columnar(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        if obj and all(isinstance(item, dict) for item in obj):
+            keys = obj[0].keys()
+            if all(item.keys() == keys for item in obj):
+                return {key: [columnar(item[key]) for item in obj] for key in keys}
+        return [columnar(item) for item in obj]
+    return obj
+
+def _requested(name):
+    value = request.args.get(name)
+    if value is None and request.is_json:
+        body = request.get_json(silent=True)
+        value = body.get(name) if isinstance(body, dict) else None
+    return value
+
+def shape(obj):
+    """Apply the request's `fields` projection and `layout` to a response body.
+
+    Both come from the query string or, for POST endpoints, the JSON body;
+    `fields` may be a comma-separated string or a list of paths. Without
+    either the object is returned untouched.
+    """
+    fields = _requested("fields")
+    layout = _requested("layout") or "rows"
+    if layout not in LAYOUTS:
+        raise InvalidShape(f"layout must be one of {', '.join(LAYOUTS)}.")
+    if fields:
+        if isinstance(fields, list):
+            if not all(isinstance(path, str) for path in fields):
+                raise InvalidShape("fields must be a list of field paths.")
+            fields = ",".join(fields)
+        elif not isinstance(fields, str):
+            raise InvalidShape("fields must be a comma-separated string or a list of field paths.")
+        obj = project(obj, parse_fields(fields))
+    if layout == "columns":
+        obj = columnar(obj)
+    return obj
@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from filelock import FileLock, Timeout
+
+LOCK_TIMEOUT = 30  # seconds a cold reader waits for another process's recompute
+
+class SharedFileCache:
+    """A computed JSON value shared by every process through one cache file.
+
+    The file holds {"_timestamp": ..., "data": ...}. Readers keep the decoded
+    value in memory and only re-read the file when its mtime or size change.
+    Once the value is older than `ttl`, or older than any of `sources`, the
+    stale value keeps being served while a single background thread
+    recomputes it (stale-while-revalidate). Across processes a file lock
+    lets exactly one of them recompute; the others find the fresh file when
+    they get the lock and skip the work. Writes go to a temporary file that
+    is renamed over the cache, so nobody reads a half-written file.
+    """
+
+    def __init__(self, path, ttl, compute, sources=(), lock_timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.ttl = ttl
+        self.compute = compute
+        self.sources = list(sources)
+        self.lock = FileLock(path + ".lock", timeout=lock_timeout)
+        self.recomputes = 0
+        self._value = None
+        self._timestamp = 0.0
+        self._signature = None
+        self._mutex = threading.Lock()
+        self._refreshing = False
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._mutex = threading.Lock()
+        self._refreshing = False
+
+    def _read(self):
+        """Bring the in-memory value up to date with the file; one stat when unchanged."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        try:
+            with open(self.path, "r") as f:
+                cached = json.load(f)
+            value, timestamp = cached["data"], cached.get("_timestamp", 0)
+        except (ValueError, KeyError, TypeError):
+            return  # unreadable cache file: treated as missing and rewritten on recompute
+        self._value, self._timestamp, self._signature = value, timestamp, signature
+
+    def _fresh(self):
+        if self._value is None or time.time() - self._timestamp >= self.ttl:
+            return False
+        for source in self.sources:
+            if os.path.exists(source) and os.path.getmtime(source) > self._timestamp:
+                return False
+        return True
+
+    def get(self, force=False):
+        with self._mutex:
+            self._read()
+            if not force and self._fresh():
+                return self._value
+            if not force and self._value is not None:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._revalidate, daemon=True).start()
+                return self._value
+        # Nothing to serve yet (or a forced refresh): wait for the value
+        return self._recompute(force=force)
+
+    def _revalidate(self):
+        try:
+            self._recompute(block=False)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Background refresh of {self.path} failed, serving the stale value: {e}")
+        finally:
+            with self._mutex:
+                self._refreshing = False
+
+    def _recompute(self, force=False, block=True):
+        try:
+            with self.lock.acquire(timeout=None if block else 0):
+                if not force:
+                    with self._mutex:
+                        self._read()
+                        if self._fresh():
+                            return self._value  # another process recomputed while we waited
+                value = self.compute()
+                timestamp = time.time()
+                self._write(value, timestamp)
+        except Timeout:
+            if block:
+                raise
+            return None  # another process holds the lock and is recomputing
+
+        stat = os.stat(self.path)
+        with self._mutex:
+            self._value, self._timestamp = value, timestamp
+            self._signature = (stat.st_mtime_ns, stat.st_size)
+            self.recomputes += 1
+        return value
+
+    def _write(self, value, timestamp):
+        # Write-then-rename so other processes never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"_timestamp": timestamp, "data": value}, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
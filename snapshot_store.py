@@ -0,0 +1,191 @@
+import json
+import os
+import numpy as np
+
+SNAPSHOT_DIR = "snapshots"
+
+# name -> (source file, layout); "teams" sources are {team: [records]}
+TABLES = {
+    "player_stats": ("player_ratings.json", "teams"),
+    "rating_scores": ("player_rating_scores.json", "list"),
+    "rosters": ("team_rosters.json", "teams"),
+    "merged_players": ("static/merged_players.json", "list"),
+}
+
+def _signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _flatten(source, layout):
+    """Turn a source file into flat records; returns (records, added_team)."""
+    if layout == "list":
+        return source, False
+    records = [
+        {"team": team, **player} if "team" not in player else player
+        for team, players in source.items() for player in players
+    ]
+    added = any("team" not in player for players in source.values() for player in players)
+    return records, added
+
+def _column(values):
+    """Encode one column as (kind, array, string table).
+
+    Nested values (e.g. {"default": "Alex"} name objects) are kept as a
+    "json" string column so exports stay lossless.
+    """
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, str) for v in present):
+        strings = sorted(set(present))
+        code = {s: i for i, s in enumerate(strings)}
+        return "str", np.array([code.get(v, -1) for v in values], dtype=np.int32), strings
+    if all(isinstance(v, (int, float)) for v in present):
+        kind = "int" if all(isinstance(v, int) for v in present) else "float"
+        if kind == "int" and len(present) == len(values):
+            return kind, np.array(values, dtype=np.int64), None
+        # Nullable columns are stored as float64 with NaN for None
+        return kind, np.array([np.nan if v is None else v for v in values], dtype=np.float64), None
+    encoded = [None if v is None else json.dumps(v, sort_keys=True) for v in values]
+    _, codes, strings = _column(encoded)
+    return "json", codes, strings
+
+def build_table(name, root=SNAPSHOT_DIR):
+    source_path, layout = TABLES[name]
+    with open(source_path, "r", encoding="utf-8") as f:
+        source = json.load(f)
+
+    records, added_team = _flatten(source, layout)
+    order = []
+    for record in records:
+        order.extend(key for key in record if key not in order)
+
+    table_dir = os.path.join(root, name)
+    os.makedirs(table_dir, exist_ok=True)
+    columns = {}
+    for key in order:
+        kind, values, strings = _column([record.get(key) for record in records])
+        np.save(os.path.join(table_dir, f"{key}.npy"), values)
+
+        # Keys absent from some records get a mask so exports can leave them out again
+        present = np.array([key in record for record in records])
+        sparse = not present.all()
+        if sparse:
+            np.save(os.path.join(table_dir, f"{key}.present.npy"), present)
+        columns[key] = {"kind": kind, "strings": strings, "sparse": sparse}
+
+    meta = {
+        "source": source_path,
+        "source_signature": _signature(source_path),
+        "layout": layout,
+        "added_team": added_team,
+        "rows": len(records),
+        "columns": columns,
+    }
+    # meta.json is written last so a half-built table never looks fresh
+    with open(os.path.join(table_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    return meta
+
+class SnapshotTable:
+    """Column-oriented view of one snapshot; numeric columns are memory-mapped."""
+
+    def __init__(self, name, root=SNAPSHOT_DIR, mmap=True):
+        self.name = name
+        self.dir = os.path.join(root, name)
+        self.mmap_mode = "r" if mmap else None
+        with open(os.path.join(self.dir, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        self._columns = {}
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def column_names(self):
+        return list(self.meta["columns"])
+
+    def is_fresh(self):
+        source = self.meta["source"]
+        return os.path.exists(source) and _signature(source) == self.meta["source_signature"]
+
+    def column(self, key):
+        """Raw array for `key`; string columns come back as codes into strings(key)."""
+        if key not in self._columns:
+            self._columns[key] = np.load(os.path.join(self.dir, f"{key}.npy"), mmap_mode=self.mmap_mode)
+        return self._columns[key]
+
+    def strings(self, key):
+        return self.meta["columns"][key]["strings"]
+
+    def values(self, key):
+        """Decoded Python values for one column (None for missing)."""
+        kind = self.meta["columns"][key]["kind"]
+        data = self.column(key)
+        if kind in ("str", "json"):
+            strings = self.strings(key)
+            if kind == "json":
+                strings = [json.loads(s) for s in strings]
+            return [strings[c] if c >= 0 else None for c in data.tolist()]
+        if data.dtype == np.float64:
+            cast = int if kind == "int" else float
+            return [None if v != v else cast(v) for v in data.tolist()]
+        return data.tolist()
+
+    def records(self):
+        names = self.column_names
+        columns = [self.values(key) for key in names]
+        masks = {
+            key: np.load(os.path.join(self.dir, f"{key}.present.npy")).tolist()
+            for key in names if self.meta["columns"][key]["sparse"]
+        }
+        records = [dict(zip(names, row)) for row in zip(*columns)]
+        for key, present in masks.items():
+            for record, keep in zip(records, present):
+                if not keep:
+                    del record[key]
+        return records
+
+    def to_source(self):
+        """Rebuild the JSON structure of the source file (for the frontend and old readers)."""
+        records = self.records()
+        if self.meta["layout"] == "list":
+            return records
+        grouped = {}
+        for record in records:
+            team = record.pop("team") if self.meta["added_team"] else record["team"]
+            grouped.setdefault(team, []).append(record)
+        return grouped
+
+def load_table(name, root=SNAPSHOT_DIR, mmap=True):
+    """Returns the snapshot table, or None when it is missing or older than its source."""
+    if not os.path.exists(os.path.join(root, name, "meta.json")):
+        return None
+    table = SnapshotTable(name, root, mmap)
+    return table if table.is_fresh() else None
+
+def load_records(name, root=SNAPSHOT_DIR):
+    """Source-shaped data for `name`, from the snapshot when fresh, else from the JSON file.
+
+    Rebuilding every record from the columns is slower than json.load, so
+    this is for exports and occasional readers; hot paths should read the
+    columns they need through load_table, as create_ratings does.
+    """
+    table = load_table(name, root)
+    if table is not None:
+        return table.to_source()
+    with open(TABLES[name][0], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def export_json(name, path, root=SNAPSHOT_DIR):
+    with open(path, "w") as f:
+        json.dump(SnapshotTable(name, root).to_source(), f, indent=2)
+
+def build_all(root=SNAPSHOT_DIR):
+    for name, (source_path, _) in TABLES.items():
+        if not os.path.exists(source_path):
+            print(f"⚠️ Skipping {name}: {source_path} not found")
+            continue
+        meta = build_table(name, root)
+        print(f"✅ {name}: {meta['rows']} rows, {len(meta['columns'])} columns")
+
+if __name__ == "__main__":
+    build_all()
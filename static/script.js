@@ -28,6 +28,23 @@ function populateTeamSelectors() {
   }
 }
 
+function renderStandings(tbody, standings) {
+  tbody.innerHTML = "";
+  standings.forEach(team => {
+    const row = document.createElement("tr");
+    row.innerHTML = `
+      <td>${team.rank}</td>
+      <td>${team.team}</td>
+      <td>${team.points}</td>
+      <td>${team.wins}</td>
+      <td>${team.games_played}</td>
+      <td>${team.goal_diff}</td>
+      <td>${team.biggest_win.score} vs ${team.biggest_win.opponent}</td>
+    `;
+    tbody.appendChild(row);
+  });
+}
+
 async function simulateSeason() {
   const table = document.getElementById("standingsTable");
   const tbody = table.querySelector("tbody");
@@ -36,24 +53,29 @@ async function simulateSeason() {
   table.style.display = "none";
 
   try {
-    const res = await fetch("http://localhost:5000/api/simulate-season");
-    const data = await res.json();
-
-    data.standings.forEach(team => {
-      const row = document.createElement("tr");
-      row.innerHTML = `
-        <td>${team.rank}</td>
-        <td>${team.team}</td>
-        <td>${team.points}</td>
-        <td>${team.wins}</td>
-        <td>${team.games_played}</td>
-        <td>${team.goal_diff}</td>
-        <td>${team.biggest_win.score} vs ${team.biggest_win.opponent}</td>
-      `;
-      tbody.appendChild(row);
-    });
-
-    table.style.display = "table";
+    // Standings snapshots arrive as NDJSON lines while the season is simulated
+    const res = await fetch("http://localhost:5000/api/simulate-season/stream");
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split("\n");
+      buffer = lines.pop();
+
+      for (const line of lines) {
+        if (!line) continue;
+        const event = JSON.parse(line);
+        if (event.type === "standings" || event.type === "final") {
+          renderStandings(tbody, event.standings);
+          table.style.display = "table";
+        }
+      }
+    }
   } catch (error) {
     alert("Failed to simulate season. Make sure the Flask server is running.");
     console.error(error);
@@ -1,52 +1,75 @@
 import json
 from collections import defaultdict
 
-# Load player data
-with open('merged_players.json') as f:
-    players = json.load(f)
-
-# Group players by team
-teams = defaultdict(list)
-for player in players:
-    teams[player['team']].append(player)
-
-# Calculate raw scores
-raw_scores = {}
-for team, roster in teams.items():
+# Tier weighting: franchise players count double, depth players count 60%
+FRANCHISE_RATING = 90
+CORE_RATING = 80
+FRANCHISE_MULTIPLIER = 2
+CORE_MULTIPLIER = 1
+DEPTH_MULTIPLIER = 0.6
+ONE_FRANCHISE_BONUS = 25
+TWO_FRANCHISE_BONUS = 50
+
+MIN_STRENGTH = 0.1
+MAX_STRENGTH = 2.0
+
+def tier_weight(rating):
+    """A player's contribution to the weighted sum, by tier."""
+    if rating >= FRANCHISE_RATING:
+        return rating * FRANCHISE_MULTIPLIER
+    elif rating >= CORE_RATING:
+        return rating * CORE_MULTIPLIER
+    return rating * DEPTH_MULTIPLIER
+
+def franchise_bonus(franchise_count):
+    return TWO_FRANCHISE_BONUS if franchise_count >= 2 else ONE_FRANCHISE_BONUS if franchise_count == 1 else 0
+
+def team_raw_score(roster):
     weighted_sum = 0
     franchise_count = 0
 
     for p in roster:
         r = p.get('rating', 0)
-        if r >= 90:
-            weighted_sum += r * 2
+        weighted_sum += tier_weight(r)
+        if r >= FRANCHISE_RATING:
             franchise_count += 1
-        elif r >= 80:
-            weighted_sum += r
-        else:
-            weighted_sum += r * 0.6
-
-    bonus = 50 if franchise_count >= 2 else 25 if franchise_count == 1 else 0
-    total = round(weighted_sum + bonus)
-    raw_scores[team] = total
-
-# Normalize to range [0.1, 2.0]
-min_score = min(raw_scores.values())
-max_score = max(raw_scores.values())
-score_range = max_score - min_score
-
-def normalize(value):
-    if score_range == 0:
-        return 1.0
-    return round(0.1 + ((value - min_score) / score_range) * (2.0 - 0.1), 2)
-
-# Create formatted output
-normalized_output = {
-    "data": {team: normalize(score) for team, score in sorted(raw_scores.items())}
-}
-
-# Write to file
-with open('normalized_ratings.json', 'w') as f:
-    json.dump(normalized_output, f, indent=2)
-
-print("✅ Normalized ratings saved to static/normalized_ratings.json")
+
+    return round(weighted_sum + franchise_bonus(franchise_count))
+
+def normalize_scores(raw_scores):
+    """Normalize to range [MIN_STRENGTH, MAX_STRENGTH]."""
+    min_score = min(raw_scores.values())
+    max_score = max(raw_scores.values())
+    score_range = max_score - min_score
+
+    def normalize(value):
+        if score_range == 0:
+            return 1.0
+        return round(MIN_STRENGTH + ((value - min_score) / score_range) * (MAX_STRENGTH - MIN_STRENGTH), 2)
+
+    return {team: normalize(score) for team, score in sorted(raw_scores.items())}
+
+def main():
+    # Load player data
+    with open('merged_players.json') as f:
+        players = json.load(f)
+
+    # Group players by team
+    teams = defaultdict(list)
+    for player in players:
+        teams[player['team']].append(player)
+
+    # Calculate raw scores
+    raw_scores = {team: team_raw_score(roster) for team, roster in teams.items()}
+
+    # Create formatted output (flat {team: strength}, as read by the season routes)
+    normalized_output = normalize_scores(raw_scores)
+
+    # Write to file
+    with open('normalized_ratings.json', 'w') as f:
+        json.dump(normalized_output, f, indent=2)
+
+    print("✅ Normalized ratings saved to static/normalized_ratings.json")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nhl_fetcher import PooledFetcher, fetch_into
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+class StandIn(BaseHTTPRequestHandler):
+    """Answers each path from a script of (status, headers, body) responses; the last one repeats."""
+
+    scripts = {}
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, dict(self.headers)))
+        script = self.scripts[self.path]
+        status, headers, body = script.pop(0) if len(script) > 1 else script[0]
+        if callable(status):
+            status, headers, body = status(self.headers)
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    StandIn.scripts = {}
+    StandIn.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield StandIn, f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def fetcher(tmp_path, **options):
+    options = {"rate": 1000, "backoff": 0.01, "retries": 3, "timeout": 5,
+               "validators_file": str(tmp_path / "validators.json"), **options}
+    return PooledFetcher(**options)
+
+def revalidating(headers):
+    """200 with validators, or 304 when the client sends them back."""
+    if headers.get("If-None-Match") == ETAG and headers.get("If-Modified-Since") == LAST_MODIFIED:
+        return 304, {"ETag": ETAG}, None
+    return 200, {"ETag": ETAG, "Last-Modified": LAST_MODIFIED}, {"team": "TOR"}
+
+def test_retries_503_until_success(server, tmp_path):
+    handler, base = server
+    handler.scripts["/stats"] = [(503, {}, None), (503, {}, None), (200, {}, {"ok": True})]
+
+    assert fetcher(tmp_path).fetch(base + "/stats") == ("updated", {"ok": True})
+    assert len(handler.requests) == 3
+
+def test_429_honours_retry_after(server, tmp_path):
+    handler, base = server
+    handler.scripts["/stats"] = [(429, {"Retry-After": "1"}, None), (200, {}, {"ok": True})]
+
+    started = time.monotonic()
+    assert fetcher(tmp_path).fetch(base + "/stats") == ("updated", {"ok": True})
+    assert time.monotonic() - started >= 1
+    assert len(handler.requests) == 2
+
+def test_gives_up_after_retries(server, tmp_path):
+    handler, base = server
+    handler.scripts["/stats"] = [(503, {}, None)]
+
+    status, error = fetcher(tmp_path, retries=2).fetch(base + "/stats")
+    assert status == "failed"
+    assert "503" in str(error)
+    assert len(handler.requests) == 3
+
+def test_stored_validators_turn_into_304(server, tmp_path):
+    handler, base = server
+    handler.scripts["/roster"] = [(revalidating, None, None)]
+
+    first = fetcher(tmp_path)
+    assert first.fetch(base + "/roster") == ("updated", {"team": "TOR"})
+    first.save_validators()
+
+    # A new fetcher (the next pipeline run) picks the validators up from disk
+    second = fetcher(tmp_path)
+    assert second.fetch(base + "/roster") == ("unchanged", None)
+    _, headers = handler.requests[-1]
+    assert headers["If-None-Match"] == ETAG
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+
+    # Unconditional fetches ignore the stored validators
+    assert second.fetch(base + "/roster", conditional=False) == ("updated", {"team": "TOR"})
+
+def test_fetch_into_keeps_unchanged_and_failed_entries(server, tmp_path):
+    handler, base = server
+    handler.scripts["/TOR"] = [(revalidating, None, None)]
+    handler.scripts["/MTL"] = [(500, {}, None)]
+    handler.scripts["/BOS"] = [(200, {}, {"team": "BOS", "fresh": True})]
+    handler.scripts["/SEA"] = [(500, {}, None)]
+
+    output = tmp_path / "stats.json"
+    output.write_text(json.dumps({"TOR": {"team": "TOR", "old": True}, "MTL": {"team": "MTL"},
+                                  "BOS": {"team": "BOS"}}))
+    options = {"rate": 1000, "backoff": 0.01, "retries": 1, "validators_file": str(tmp_path / "validators.json")}
+
+    # Seed TOR's validators, as an earlier run would have
+    seed = PooledFetcher(**options)
+    seed.fetch(base + "/TOR")
+    seed.save_validators()
+
+    urls = {team: f"{base}/{team}" for team in ("TOR", "MTL", "BOS", "SEA")}
+    results = fetch_into(str(output), urls, **options)
+
+    assert results["TOR"] == ("unchanged", None)
+    assert results["MTL"][0] == "failed"
+    merged = json.loads(output.read_text())
+    assert merged == {
+        "TOR": {"team": "TOR", "old": True},  # 304: previous payload kept
+        "MTL": {"team": "MTL"},  # failed: previous payload kept
+        "BOS": {"team": "BOS", "fresh": True}  # SEA failed with nothing to keep
+    }
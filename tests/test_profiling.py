@@ -0,0 +1,51 @@
+import pytest
+from flask import Flask, jsonify
+
+import http_cache
+import parallel
+import profiling
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    app = Flask(__name__)
+    profiling.install(app)
+    builds = []
+
+    @app.route("/active")
+    def active():
+        return jsonify(profiling.active())
+
+    @app.route("/cached")
+    def cached():
+        return http_cache.snapshot_json("fingerprint", lambda: builds.append(1) or {"builds": len(builds)})
+
+    http_cache.clear()
+    client = app.test_client()
+    client.builds = builds
+    yield client
+    http_cache.clear()
+
+def test_active_only_while_profiling(client):
+    assert client.get("/active").get_json() is False
+    response = client.get("/active?profile=1")
+    assert response.get_json() is True
+    assert profiling.report_path(response.headers["X-Profile-Id"]) is not None
+
+def test_profiled_requests_skip_the_body_cache(client):
+    client.get("/cached")
+    client.get("/cached")
+    assert len(client.builds) == 1
+
+    for _ in range(2):
+        response = client.get("/cached?profile=1")
+        assert response.headers["Cache-Control"] == "no-store"
+    assert len(client.builds) == 3
+
+def test_sampling_falls_back_to_cprofile_under_gevent(client, monkeypatch):
+    monkeypatch.setattr(parallel, "gevent_patched", lambda: True)
+    profile_id = client.get("/active?profile=sample").headers["X-Profile-Id"]
+    with open(profiling.report_path(profile_id)) as f:
+        assert "cprofile profile" in f.read()
+    assert profiling.report_path(profile_id, "pstats") is not None
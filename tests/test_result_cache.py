@@ -0,0 +1,33 @@
+from result_cache import ResultCache
+
+def compute(value):
+    calls = []
+
+    def run():
+        calls.append(value)
+        return {"value": value}
+    return run, calls
+
+def test_fingerprints_share_the_cache(tmp_path):
+    cache = ResultCache(disk_dir=str(tmp_path))
+    live, live_calls = compute("live")
+    scenario, scenario_calls = compute("scenario")
+
+    cache.get_or_compute("aaaa", "season", {}, 1, live)
+    cache.get_or_compute("bbbb", "season", {}, 1, scenario)
+    assert cache.get_or_compute("aaaa", "season", {}, 1, live) == {"value": "live"}
+    assert cache.get_or_compute("bbbb", "season", {}, 1, scenario) == {"value": "scenario"}
+    assert (live_calls, scenario_calls) == (["live"], ["scenario"])
+
+def test_purge_drops_only_that_fingerprint(tmp_path):
+    cache = ResultCache(disk_dir=str(tmp_path))
+    old, old_calls = compute("old")
+    other, other_calls = compute("other")
+    cache.get_or_compute("aaaa", "season", {}, 1, old)
+    cache.get_or_compute("bbbb", "season", {}, 1, other)
+
+    cache.purge("aaaa")
+    assert [path.name.split("-")[0] for path in tmp_path.iterdir()] == ["bbbb"]
+    cache.get_or_compute("aaaa", "season", {}, 1, old)
+    cache.get_or_compute("bbbb", "season", {}, 1, other)
+    assert (old_calls, other_calls) == (["old", "old"], ["other"])
@@ -0,0 +1,209 @@
+import copy
+import os
+
+import pytest
+
+import app
+import calculate_team_ratings
+import http_cache
+from data_registry import Snapshot
+from result_cache import ResultCache
+from samplers import RosterSampler
+from shared_cache import SharedFileCache
+from static import team_ratings as tier_model
+from what_if import InvalidMove, Scenario, ScenarioBook
+
+# --- A small synthetic league ---
+
+TEAMS = ["AAA", "BBB", "CCC", "DDD"]
+RATINGS = {
+    "AAA": [95, 91, 84, 78, 70],
+    "BBB": [88, 82, 80, 76, 72],
+    "CCC": [93, 79, 77, 74, 69],
+    "DDD": [86, 85, 81, 75, 71]
+}
+GOALIE_RATING = 83  # merged_players only: goalies are not on team_rosters
+
+def normalize(rating):
+    return app.normalize_rating(rating)
+
+def league():
+    rosters = {
+        team: [{"id": t * 100 + i, "name": f"{team} {i}", "position": "C", "rating": rating}
+               for i, rating in enumerate(RATINGS[team])]
+        for t, team in enumerate(TEAMS)
+    }
+    merged = [{"id": p["id"], "team": team, "rating": p["rating"]} for team, players in rosters.items() for p in players]
+    merged += [{"id": 9000 + t, "team": team, "rating": GOALIE_RATING} for t, team in enumerate(TEAMS)]
+    data = {
+        "strengths": {team: 0.6 + 0.1 * t for t, team in enumerate(TEAMS)},
+        "season_strengths": {team: 0.5 + 0.25 * t for t, team in enumerate(TEAMS)},
+        "rosters": rosters
+    }
+    base = Snapshot(1, data, {name: 1 for name in data}, {name: f"{name}-v1" for name in data})
+    samplers = {team: RosterSampler(players) for team, players in rosters.items()}
+    return base, merged, samplers
+
+def scenario():
+    return Scenario(*league(), normalize)
+
+def state(s):
+    return copy.deepcopy((s.rosters, s.counts, s.totals, s._merged, s.merged_counts, s.weighted, s.franchise,
+                          s.moves, s.revision))
+
+def assert_sums_match_models(s):
+    rosters = {team: list(players.values()) for team, players in s.rosters.items()}
+    assert s.counts == {team: len(players) for team, players in rosters.items()}
+    assert s.totals == {team: sum(p["rating"] for p in players) for team, players in rosters.items()}
+    assert s._model()["team_ratings"] == calculate_team_ratings.compute_team_ratings(rosters)
+
+    merged = {}
+    for team, rating in s._merged.values():
+        merged.setdefault(team, []).append({"rating": rating})
+    for team, players in merged.items():
+        assert s.weighted[team] == pytest.approx(sum(tier_model.tier_weight(p["rating"]) for p in players))
+        assert s.franchise[team] == sum(p["rating"] >= tier_model.FRANCHISE_RATING for p in players)
+        raw = round(s.weighted[team] + tier_model.franchise_bonus(s.franchise[team]))
+        assert raw == tier_model.team_raw_score(players)
+
+def test_running_sums_match_a_recompute_after_moves():
+    s = scenario()
+    assert_sums_match_models(s)
+    s.apply([{"id": 0, "to": "BBB"}, {"id": 200, "to": "DDD"}])  # franchise players change teams
+    assert_sums_match_models(s)
+    s.apply([{"id": 104, "to": None}, {"id": 9001, "to": "AAA"}])  # a release, and a goalie
+    assert_sums_match_models(s)
+    s.apply([{"player": {"id": 5000, "name": "New", "rating": 92, "position": "D"}, "to": "CCC"}])
+    assert_sums_match_models(s)
+    s.apply([{"id": 0, "to": "AAA"}])  # and back again
+    assert_sums_match_models(s)
+    assert s.revision == 4
+
+def test_moves_without_change_keep_the_base_strengths():
+    s = scenario()
+    snapshot = s.snapshot()
+    assert snapshot["strengths"] == s.base["strengths"]
+    assert snapshot["season_strengths"] == s.base["season_strengths"]
+
+    s.apply([{"id": 0, "to": "CCC"}])
+    moved = s.snapshot()
+    assert moved["strengths"]["AAA"] < s.base["strengths"]["AAA"]
+    assert moved["strengths"]["CCC"] > s.base["strengths"]["CCC"]
+    assert set(s.summary()["changed_teams"]) >= {"AAA", "CCC"}
+
+@pytest.mark.parametrize("bad_move", [
+    {"id": 12345, "to": "BBB"},  # unknown player
+    {"id": 1, "to": "ZZZ"},  # unknown team
+    {"id": 1, "to": "AAA"},  # already there
+    {"id": True, "to": "BBB"},
+    {"player": {"id": 5000, "name": "New", "rating": True}, "to": "BBB"},
+    {"player": {"id": 100, "name": "Dup", "rating": 80}, "to": "BBB"}
+])
+def test_a_failing_move_rolls_back_the_whole_batch(bad_move):
+    s = scenario()
+    before = state(s)
+    with pytest.raises(InvalidMove):
+        s.apply([{"id": 0, "to": "BBB"}, {"player": {"id": 5001, "name": "X", "rating": 90}, "to": "CCC"}, bad_move])
+    assert state(s) == before
+    assert_sums_match_models(s)
+
+def test_a_team_cannot_lose_its_whole_roster():
+    s = scenario()
+    before = state(s)
+    release = [{"id": p, "to": None} for p in range(len(RATINGS["AAA"]))]
+    with pytest.raises(InvalidMove, match="AAA"):
+        s.apply(release)
+    assert state(s) == before
+
+    s.apply(release[:-1])
+    assert len(s.samplers()["AAA"].names) == 1
+
+def test_book_replays_saved_scenarios_in_a_fresh_book(tmp_path):
+    book = ScenarioBook(league, normalize, disk_dir=str(tmp_path))
+    created = book.create([{"id": 0, "to": "BBB"}])
+    book.apply(created.id, [{"player": {"id": 5000, "name": "New", "rating": 92}, "to": "DDD"}, {"id": 104, "to": None}])
+
+    replayed = ScenarioBook(league, normalize, disk_dir=str(tmp_path)).get(created.id)
+    assert replayed is not created
+    assert (replayed.revision, replayed.moves) == (created.revision, created.moves)
+    assert state(replayed) == state(created)
+    assert replayed.snapshot().fingerprint == created.snapshot().fingerprint
+    assert replayed.snapshot()["strengths"] == created.snapshot()["strengths"]
+    assert_sums_match_models(replayed)
+
+# --- Through the app ---
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    # Private caches: don't rewrite the tracked team_strengths.json or touch shared directories
+    strengths_file = str(tmp_path / os.path.basename(app.CACHE_FILE))
+    monkeypatch.setattr(app, "strength_cache", SharedFileCache(
+        strengths_file, app.CACHE_TTL_SECONDS, app.generate_strengths, sources=[app.TEAM_RATINGS_FILE]
+    ))
+    monkeypatch.setattr(app, "result_cache", ResultCache())
+    monkeypatch.setattr(app, "scenarios", ScenarioBook(app.scenario_source, app.normalize_rating))
+    http_cache.clear()
+    return app.app.test_client()
+
+def create_scenario(client, moves=()):
+    response = client.post("/api/what-if/scenarios", json={"moves": list(moves)})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
+
+def test_empty_scenario_plays_like_the_live_data(client):
+    scenario_id = create_scenario(client)
+    snapshot = app.scenarios.get(scenario_id).snapshot()
+    live = app.registry.snapshot()
+    assert snapshot["strengths"] == live["strengths"]
+    assert snapshot["season_strengths"] == live["season_strengths"]
+
+    live_season = client.get("/api/simulate-season?seed=7").get_json()
+    scenario_season = client.get(f"/api/simulate-season?seed=7&scenario={scenario_id}").get_json()
+    assert scenario_season == live_season
+    assert app.scenarios.get(scenario_id).summary()["changed_teams"] == {}
+
+def test_moves_shift_the_live_strengths(client):
+    live = app.registry.snapshot()
+    team, players = next(iter(live["rosters"].items()))
+    best = max(players, key=lambda player: player["rating"])
+    scenario_id = create_scenario(client, [{"id": best["id"], "to": None}])
+
+    changed = app.scenarios.get(scenario_id).summary()["changed_teams"]
+    assert changed[team]["baseline_strength"] == live["strengths"][team]
+    assert changed[team]["strength"] < live["strengths"][team]
+
+def test_scenarios_leave_live_results_cached(client):
+    scenario_id = create_scenario(client)
+    client.get("/api/simulate-season?seed=11")
+    client.get(f"/api/simulate-season?seed=11&scenario={scenario_id}")
+    http_cache.clear()  # past the encoded body, down to the result cache
+
+    hits = app.result_cache.hits
+    client.get("/api/simulate-season?seed=11")
+    assert app.result_cache.hits == hits + 1
+
+def test_emptying_a_roster_is_rejected(client):
+    team, players = next(iter(app.registry.snapshot()["rosters"].items()))
+    release = [{"id": player["id"], "to": None} for player in players]
+    response = client.post("/api/what-if/scenarios", json={"moves": release})
+    assert response.status_code == 400
+    assert team in response.get_json()["error"]
+
+    scenario_id = create_scenario(client, release[:-1])
+    response = client.post(f"/api/what-if/scenarios/{scenario_id}/moves", json={"moves": release[-1:]})
+    assert response.status_code == 400
+    assert client.get(f"/api/player-projections?n=1&seed=1&top=3&scenario={scenario_id}").status_code == 200
+
+@pytest.mark.parametrize("body", [[1, 2], "moves", 3])
+def test_non_object_bodies_are_rejected(client, body):
+    assert client.post("/api/what-if/scenarios", json=body).status_code == 400
+    scenario_id = create_scenario(client)
+    assert client.post(f"/api/what-if/scenarios/{scenario_id}/moves", json=body).status_code == 400
+
+@pytest.mark.parametrize("move", [
+    {"id": True, "to": "TOR"},
+    {"player": {"id": True, "name": "New", "rating": 80}, "to": "TOR"},
+    {"player": {"id": 1, "name": "New", "rating": True}, "to": "TOR"}
+])
+def test_booleans_are_not_numbers(client, move):
+    assert client.post("/api/what-if/scenarios", json={"moves": [move]}).status_code == 400
@@ -0,0 +1,449 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+
+import calculate_team_ratings as avg_model
+from data_registry import Snapshot
+from head_to_head import HeadToHeadTable
+from playoffs import PlayoffTable
+from samplers import RosterSampler
+from static import team_ratings as tier_model
+
+MAX_SCENARIOS = 50  # in memory per process
+MAX_SCENARIO_FILES = 500
+MAX_MOVES = 200  # per request
+SCENARIO_SOURCES = ("strengths", "season_strengths", "rosters")
+SCENARIO_ID = re.compile(r"^[0-9a-f]{12}$")
+TEAM_SUMS = ("counts", "totals", "merged_counts", "weighted", "franchise")  # per-team running sums
+
+class InvalidMove(ValueError):
+    pass
+
+class UnknownScenario(LookupError):
+    pass
+
+def _number(value, types):
+    # JSON true/false arrive as bools, which are ints to isinstance
+    return isinstance(value, types) and not isinstance(value, bool)
+
+class ScenarioSnapshot(Snapshot):
+    """The base Snapshot with strengths, season strengths and rosters taken from a scenario.
+
+    The replaced sources get their own hashes and versions, so the
+    fingerprint, result cache keys and ETags differ per scenario revision
+    and per base snapshot the scenario was replayed onto.
+    """
+
+    def __init__(self, scenario, ratings, rosters):
+        base = scenario.base
+        tag = f"scenario:{base.fingerprint}:{scenario.id}:{scenario.revision}"
+        data = {**base.data, "strengths": ratings["strengths"], "season_strengths": ratings["season_strengths"],
+                "rosters": rosters}
+        hashes = {**base.hashes, **{
+            name: hashlib.sha256(f"{tag}:{name}".encode()).hexdigest() for name in SCENARIO_SOURCES
+        }}
+        versions = {**base.versions, **{name: scenario.revision for name in SCENARIO_SOURCES}}
+        super().__init__(base.version, data, versions, hashes)
+        self.scenario = scenario
+        self.team_ratings = ratings["team_ratings"]
+
+class Scenario:
+    """Hypothetical roster moves on top of one data snapshot.
+
+    Each team keeps running sums for both rating models: roster size and
+    rating total for calculate_team_ratings' averages, and the tier-weighted
+    sum and franchise count for static/team_ratings. A move adjusts the
+    sums of the two teams involved in O(1); only the final min/max scaling
+    across teams is redone, once per revision. The served strengths are the
+    snapshot's own plus how far the models have moved since the unmodified
+    rosters, so a scenario without moves plays exactly like the live data
+    even when the committed ratings lag the rosters. Teams a model does not
+    rate keep the snapshot's strength.
+
+    A scenario keeps the snapshot it was created from; later data reloads
+    do not change it.
+    """
+
+    def __init__(self, base, merged_players, base_samplers, normalize, scenario_id=None):
+        self.id = scenario_id or uuid.uuid4().hex[:12]
+        self.base = base
+        self.normalize = normalize  # team rating -> game strength, as load_or_generate_strengths does
+        self.revision = 0
+        self.moves = []
+        self.teams = list(base["strengths"].keys())
+        self.head_to_head_table = HeadToHeadTable()
+        self.playoff_table = PlayoffTable()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.file_signature = None  # of the shared scenario file this state matches
+
+        # team_rosters view: {team: {id: player}} with count and rating total per team
+        self.rosters = {team: {p["id"]: p for p in players} for team, players in base["rosters"].items()}
+        self._roster_team = {pid: team for team, players in self.rosters.items() for pid in players}
+        self.counts = {team: len(players) for team, players in self.rosters.items()}
+        self.totals = {team: sum(p["rating"] for p in players.values()) for team, players in self.rosters.items()}
+
+        # merged_players view: id -> (team, rating) with tier sums per team
+        self._merged = {p["id"]: (p["team"], p.get("rating", 0)) for p in merged_players}
+        self.merged_counts, self.weighted, self.franchise = {}, {}, {}
+        for team, rating in self._merged.values():
+            self._add_merged(team, rating)
+
+        self._samplers = dict(base_samplers)
+        self._stale_samplers = set()
+        self._journal = None  # what the batch being applied changed, for rollback
+        self._model_baseline = self._model()
+
+    # --- Running sums ---
+
+    def _add_merged(self, team, rating, sign=1):
+        self.merged_counts[team] = self.merged_counts.get(team, 0) + sign
+        self.weighted[team] = self.weighted.get(team, 0) + sign * tier_model.tier_weight(rating)
+        self.franchise[team] = self.franchise.get(team, 0) + sign * (rating >= tier_model.FRANCHISE_RATING)
+
+    def _remember_team(self, team):
+        """Save `team`'s roster and sums the first time a batch touches it."""
+        if team not in self._journal["teams"]:
+            roster = self.rosters.get(team)
+            self._journal["teams"][team] = (
+                None if roster is None else dict(roster),
+                {name: getattr(self, name).get(team) for name in TEAM_SUMS}
+            )
+
+    def _rollback(self):
+        # Restoring the saved values, rather than undoing each move, brings back
+        # the exact float sums and roster order that seeded simulations depend on
+        for team, (roster, sums) in self._journal["teams"].items():
+            for name, value in (("rosters", roster), *sums.items()):
+                if value is None:
+                    getattr(self, name).pop(team, None)
+                else:
+                    getattr(self, name)[team] = value
+        for player_id, (roster_team, merged) in self._journal["players"].items():
+            for view, value in ((self._roster_team, roster_team), (self._merged, merged)):
+                if value is None:
+                    view.pop(player_id, None)
+                else:
+                    view[player_id] = value
+        self._stale_samplers = self._journal["stale"]
+
+    def _place(self, player_id, roster_entry, merged_entry):
+        """Put `player_id` at (team, player) in the roster view and (team, rating) in the
+        merged view, None meaning absent."""
+        previous_team = self._roster_team.get(player_id)
+        previous = (
+            (previous_team, self.rosters[previous_team][player_id]) if previous_team else None,
+            self._merged.get(player_id)
+        )
+        self._journal["players"].setdefault(player_id, (previous_team, previous[1]))
+        for entry in (*previous, roster_entry, merged_entry):
+            if entry:
+                self._remember_team(entry[0])
+
+        if previous[0]:
+            team, player = previous[0]
+            del self.rosters[team][player_id]
+            del self._roster_team[player_id]
+            self.counts[team] -= 1
+            self.totals[team] -= player["rating"]
+            self._stale_samplers.add(team)
+        if roster_entry:
+            team, player = roster_entry
+            self.rosters.setdefault(team, {})[player_id] = player
+            self._roster_team[player_id] = team
+            self.counts[team] = self.counts.get(team, 0) + 1
+            self.totals[team] = self.totals.get(team, 0) + player["rating"]
+            self._stale_samplers.add(team)
+
+        if previous[1]:
+            self._add_merged(*previous[1], sign=-1)
+            del self._merged[player_id]
+        if merged_entry:
+            self._add_merged(*merged_entry)
+            self._merged[player_id] = merged_entry
+
+    # --- Moves ---
+
+    def _move(self, move):
+        if not isinstance(move, dict):
+            raise InvalidMove("Each move must be an object.")
+        to = move.get("to")
+        if to is not None and to not in self.teams:
+            raise InvalidMove(f"Unknown team {to!r}.")
+
+        if "player" in move:
+            player = move["player"]
+            if not isinstance(player, dict) or not _number(player.get("id"), int) \
+                    or not _number(player.get("rating"), (int, float)) or not isinstance(player.get("name"), str):
+                raise InvalidMove("player needs an integer id, a name and a numeric rating.")
+            if to is None:
+                raise InvalidMove("A new player needs a team to join.")
+            player_id = player["id"]
+            if player_id in self._roster_team or player_id in self._merged:
+                raise InvalidMove(f"Player {player_id} already exists; move them by id instead.")
+            player = {"id": player_id, "name": player["name"], "position": player.get("position", ""),
+                      "rating": player["rating"]}
+            placement = ((to, player), (to, player["rating"]))
+            record = {"player": player, "from": None, "to": to}
+        else:
+            player_id = move.get("id")
+            if not _number(player_id, int):
+                raise InvalidMove("Each move needs an integer player id, or a new player.")
+            roster_team = self._roster_team.get(player_id)
+            merged = self._merged.get(player_id)
+            if roster_team is None and merged is None:
+                raise InvalidMove(f"Unknown player id {player_id!r}.")
+            current = roster_team or merged[0]
+            if to == current:
+                raise InvalidMove(f"Player {player_id} is already on {to}.")
+            placement = (
+                (to, self.rosters[roster_team][player_id]) if roster_team and to else None,
+                (to, merged[1]) if merged and to else None
+            )
+            record = {"id": player_id, "from": current, "to": to}
+
+        self._place(player_id, *placement)
+        return record
+
+    def apply(self, moves):
+        """Apply a list of moves all-or-nothing; returns the teams they touched.
+
+        {"id": 8478402, "to": "TOR"} moves a player, "to": null releases
+        them, and {"player": {"id", "name", "rating", "position"}, "to": ...}
+        signs someone new.
+        """
+        if not isinstance(moves, list) or len(moves) > MAX_MOVES:
+            raise InvalidMove(f"moves must be a list of at most {MAX_MOVES} moves.")
+        return self._apply(moves)
+
+    def replay(self, moves, revision):
+        """Rebuild the state another process saved: its recorded moves, at its revision."""
+        self._apply(moves)
+        self.revision = revision
+
+    def _apply(self, moves):
+        with self._lock:
+            records = []
+            self._journal = {"teams": {}, "players": {}, "stale": set(self._stale_samplers)}
+            try:
+                for move in moves:
+                    records.append(self._move(move))
+                # The goal model draws scorers from every team's roster
+                emptied = sorted({record["from"] for record in records
+                                  if record["from"] and not self.counts.get(record["from"])
+                                  and self.base["rosters"].get(record["from"])})
+                if emptied:
+                    raise InvalidMove(f"Moves would leave {', '.join(emptied)} without rostered players.")
+            except InvalidMove:
+                self._rollback()
+                raise
+            finally:
+                self._journal = None
+
+            if records:
+                self.moves.extend(records)
+                self.revision += 1
+                self._snapshot = None
+            return sorted({team for record in records for team in (record["from"], record["to"]) if team})
+
+    # --- Ratings ---
+
+    def _model(self):
+        """Both rating models on the scenario's current rosters."""
+        averages = {team: self.totals[team] / count if count else 0 for team, count in self.counts.items()}
+        low, high = min(averages.values()), max(averages.values())
+        team_ratings = {team: avg_model.scale_softened(avg, low, high) for team, avg in averages.items()}
+
+        raw = {
+            team: round(self.weighted[team] + tier_model.franchise_bonus(self.franchise[team]))
+            for team, count in self.merged_counts.items() if count
+        }
+        strengths = {team: self.normalize(rating) for team, rating in team_ratings.items()}
+        return {"team_ratings": team_ratings, "strengths": strengths,
+                "season_strengths": tier_model.normalize_scores(raw)}
+
+    def _ratings(self):
+        model, before = self._model(), self._model_baseline
+
+        def shifted(name, team, value, digits, bounds=None):
+            now, then = model[name].get(team), before[name].get(team)
+            if now is None or then is None or now == then:
+                return value
+            value = value + now - then
+            if bounds:
+                value = min(max(value, bounds[0]), bounds[1])
+            return round(value, digits)
+
+        strengths = {team: shifted("strengths", team, value, 3) for team, value in self.base["strengths"].items()}
+        season_strengths = {
+            team: shifted("season_strengths", team, value, 2, (tier_model.MIN_STRENGTH, tier_model.MAX_STRENGTH))
+            for team, value in self.base["season_strengths"].items()
+        }
+        return {"team_ratings": model["team_ratings"], "strengths": strengths, "season_strengths": season_strengths}
+
+    def snapshot(self):
+        with self._lock:
+            if self._snapshot is None:
+                rosters = {team: list(players.values()) for team, players in self.rosters.items()}
+                self._snapshot = ScenarioSnapshot(self, self._ratings(), rosters)
+            return self._snapshot
+
+    def samplers(self):
+        """Roster samplers with only the teams changed since the last call rebuilt."""
+        with self._lock:
+            for team in self._stale_samplers:
+                self._samplers[team] = RosterSampler(list(self.rosters[team].values()))
+            self._stale_samplers.clear()
+            return dict(self._samplers)
+
+    def summary(self):
+        snapshot = self.snapshot()
+        changed = {}
+        for team in self.teams:
+            now = (snapshot.team_ratings.get(team), snapshot["strengths"][team], snapshot["season_strengths"].get(team))
+            before = (self._model_baseline["team_ratings"].get(team), self.base["strengths"][team],
+                      self.base["season_strengths"].get(team))
+            if now != before:
+                changed[team] = {
+                    "rating": now[0], "baseline_rating": before[0],
+                    "strength": now[1], "baseline_strength": before[1],
+                    "season_strength": now[2], "baseline_season_strength": before[2]
+                }
+        return {
+            "id": self.id,
+            "revision": self.revision,
+            "base_fingerprint": self.base.fingerprint,
+            "moves": self.moves,
+            "changed_teams": changed
+        }
+
+class ScenarioBook:
+    """Live scenarios by id, dropping the least recently used past `max_scenarios`.
+
+    `source()` returns the (snapshot, merged players, roster samplers) a new
+    scenario starts from. With `disk_dir` set, each scenario's moves are also
+    saved there, so any server process can rebuild a scenario another one
+    created or changed by replaying them onto its own data. Concurrent moves
+    to one scenario from two processes are last-writer-wins.
+    """
+
+    def __init__(self, source, normalize, max_scenarios=MAX_SCENARIOS, disk_dir=None,
+                 max_disk_scenarios=MAX_SCENARIO_FILES):
+        self.source = source
+        self.normalize = normalize
+        self.max_scenarios = max_scenarios
+        self.disk_dir = disk_dir
+        self.max_disk_scenarios = max_disk_scenarios
+        self._scenarios = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def create(self, moves=()):
+        scenario = Scenario(*self.source(), self.normalize)
+        scenario.apply(list(moves))  # before registering, so invalid moves leave no scenario behind
+        self._remember(scenario)
+        self._save(scenario)
+        return scenario
+
+    def apply(self, scenario_id, moves):
+        scenario = self.get(scenario_id)
+        scenario.apply(moves)
+        self._save(scenario)
+        return scenario
+
+    def get(self, scenario_id):
+        with self._lock:
+            scenario = self._scenarios.get(scenario_id)
+            if scenario is not None:
+                self._scenarios.move_to_end(scenario_id)
+
+        if self.disk_dir and SCENARIO_ID.match(scenario_id):
+            signature = self._file_signature(scenario_id)
+            if signature is None:
+                scenario = None  # deleted by another process, or never saved
+            elif scenario is None or scenario.file_signature != signature:
+                scenario = self._load(scenario_id, signature)
+        if scenario is None:
+            with self._lock:
+                self._scenarios.pop(scenario_id, None)
+            raise UnknownScenario(f"Unknown scenario {scenario_id!r}.")
+        return scenario
+
+    def delete(self, scenario_id):
+        with self._lock:
+            found = self._scenarios.pop(scenario_id, None) is not None
+        if self.disk_dir and SCENARIO_ID.match(scenario_id):
+            try:
+                os.remove(self._path(scenario_id))
+                found = True
+            except FileNotFoundError:
+                pass
+        if not found:
+            raise UnknownScenario(f"Unknown scenario {scenario_id!r}.")
+
+    def _remember(self, scenario):
+        with self._lock:
+            self._scenarios[scenario.id] = scenario
+            self._scenarios.move_to_end(scenario.id)
+            while len(self._scenarios) > self.max_scenarios:
+                self._scenarios.popitem(last=False)
+
+    # --- Shared files ---
+
+    def _path(self, scenario_id):
+        return os.path.join(self.disk_dir, scenario_id + ".json")
+
+    def _file_signature(self, scenario_id):
+        try:
+            stat = os.stat(self._path(scenario_id))
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _save(self, scenario):
+        if not self.disk_dir:
+            return
+        # Write-then-rename so other processes never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"revision": scenario.revision, "moves": scenario.moves}, f)
+            os.replace(tmp, self._path(scenario.id))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        scenario.file_signature = self._file_signature(scenario.id)
+        self._prune_disk()
+
+    def _load(self, scenario_id, signature):
+        try:
+            with open(self._path(scenario_id), "r") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        scenario = Scenario(*self.source(), self.normalize, scenario_id=scenario_id)
+        scenario.replay(saved["moves"], saved["revision"])
+        scenario.file_signature = signature
+        self._remember(scenario)
+        return scenario
+
+    def _prune_disk(self):
+        try:
+            names = [name for name in os.listdir(self.disk_dir) if name.endswith(".json")]
+        except OSError:
+            return
+        if len(names) <= self.max_disk_scenarios:
+            return
+        paths = sorted((os.path.join(self.disk_dir, name) for name in names), key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_disk_scenarios]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # another process got there first